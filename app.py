@@ -6,7 +6,7 @@ A pygame-based MIDI piano practice application for learning notes.
 
 import sys
 import os
-from piano.core.logger import get_logger
+from piano.core.logger import configure_logging, get_logger, shutdown_logging
 
 # Create logger for this module
 logger = get_logger(__name__)
@@ -60,10 +60,12 @@ class PianoPracticeApp:
         # TODO: Quit pygame properly
         # TODO: Any other cleanup
         logger.info("[Main] - Application shutdown complete")
+        shutdown_logging()  # Write queued log records before exiting
 
 
 def main():
     """Entry point for the application."""
+    configure_logging()
     logger.info("[Main] - Piano Practice Application Starting")
     
     try:
@@ -0,0 +1,85 @@
+"""MIDI events per second the practice loop sustains.
+
+PracticeApp runs headless fed by a SyntheticSource at increasing rates. A rate
+is sustained when, at the end of the run, the loop has consumed the events
+generated up to `--max-lag` milliseconds before; beyond that events pile up in
+the capture ring and the source, and on a real device PortMidi would start
+dropping them.
+
+    python benchmarks/event_throughput.py
+    python benchmarks/event_throughput.py --rates 1000 5000 20000 --seconds 3 --json
+"""
+
+import argparse
+import threading
+
+import harness
+
+DEFAULT_RATES = [100, 500, 1000, 2000, 5000, 10000, 20000, 50000]
+
+
+def measure(rate, seconds=2.0, max_lag_ms=100):
+    from piano.midi.input import SyntheticSource
+
+    PracticeApp = harness.load_practice_app()
+    source = SyntheticSource(rate, seed=1)
+    app = PracticeApp(source=source, db_path=None)
+    consumed = [0]
+    read = app.midi_input.read
+
+    def counting_read(*args):
+        events = read(*args)
+        consumed[0] += len(events)
+        return events
+
+    app.midi_input.read = counting_read
+    result = {}
+
+    def stop():
+        # Measured before quitting, the loop still runs
+        elapsed = source.time() / 1000
+        lag_ms = (int(elapsed * rate) - consumed[0]) / rate * 1000
+        result.update(rate=rate, seconds=round(elapsed, 3), consumed=consumed[0],
+                      events_per_second=round(consumed[0] / elapsed), lag_ms=round(lag_ms, 1),
+                      sustained=lag_ms <= max_lag_ms)
+        harness.quit_loop()
+
+    threading.Timer(seconds, stop).start()
+    app.run()
+    return result
+
+
+def run(rates=DEFAULT_RATES, seconds=2.0, max_lag_ms=100):
+    runs = []
+    for rate in rates:
+        runs.append(measure(rate, seconds, max_lag_ms))
+        if not runs[-1]["sustained"]:
+            break
+    sustained = [r["rate"] for r in runs if r["sustained"]]
+    return {
+        "benchmark": "event_throughput",
+        "max_lag_ms": max_lag_ms,
+        "max_sustained_rate": max(sustained) if sustained else None,
+        "runs": runs,
+    }
+
+
+def describe(result):
+    lines = [f"{r['rate']:>6} events/s: consumed {r['events_per_second']}/s, lag {r['lag_ms']} ms"
+             f"{'' if r['sustained'] else ' (not sustained)'}" for r in result["runs"]]
+    lines.append(f"max sustained rate: {result['max_sustained_rate']} events/s")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=DEFAULT_RATES)
+    parser.add_argument("--seconds", type=float, default=2.0, help="duration of each rate")
+    parser.add_argument("--max-lag", type=int, default=100, help="backlog in ms above which a rate is not sustained")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+    harness.output(run(args.rates, args.seconds, args.max_lag), args.json, describe)
+
+
+if __name__ == "__main__":
+    main()
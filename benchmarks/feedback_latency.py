@@ -0,0 +1,123 @@
+"""Note-event-to-screen-update latency of the practice app.
+
+The app runs headless with a queue as its MIDI input. A driver thread
+plays the prompted note, waits for the frame showing the answer and measures
+the time from the note being sent to that frame being presented: MIDI
+capture, the wakeup of the loop, handling and drawing.
+
+By default the app redraws on demand, so this measures the idle wakeup path;
+`--fps` measures the fixed frame rate path instead.
+
+    python benchmarks/feedback_latency.py
+    python benchmarks/feedback_latency.py --notes 500 --interval 20 --json
+"""
+
+import argparse
+import threading
+import time
+from collections import deque
+
+import harness
+
+
+class DrivenSource:
+    """MIDI input source fed by the benchmark thread, deque operations are thread safe."""
+
+    name = "Benchmark"
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._events = deque()
+
+    def time(self):
+        return int((time.perf_counter() - self._start) * 1000)
+
+    def send(self, status, data1, data2):
+        self._events.append([[status, data1, data2, 0], self.time()])
+
+    def poll(self):
+        return bool(self._events)
+
+    def read(self, max_events):
+        events = self._events
+        return [events.popleft() for _ in range(min(len(events), max_events))]
+
+    def close(self):
+        self._events.clear()
+
+
+def run(notes=200, interval_ms=50, fps=None):
+    PracticeApp = harness.load_practice_app()
+    source = DrivenSource()
+    app = PracticeApp(fps=fps, source=source, db_path=None)
+    frames = harness.record_presents(app)
+    handled = []  # perf_counter time at which each note was handled
+    handle_midi_event = app.handle_midi_event
+
+    def timed_handle_midi_event(*args):
+        handle_midi_event(*args)
+        handled.append(time.perf_counter())
+
+    app.handle_midi_event = timed_handle_midi_event
+    latencies = []
+    missed = 0
+
+    def drive():
+        nonlocal missed
+        time.sleep(0.5)  # Let the first frames go out
+        for _ in range(notes):
+            count, first_frame = len(handled), len(frames)
+            note = app.current_note
+            sent = time.perf_counter()
+            source.send(0x90, note, 100)
+            source.send(0x80, note, 0)
+            deadline = sent + 1.0
+            # Wait for the first frame started after the note was handled
+            frame = None
+            while frame is None and time.perf_counter() < deadline:
+                time.sleep(0.0002)
+                if len(handled) > count:
+                    frame = next((end for start, end in frames[first_frame:] if start >= handled[count]), None)
+            if frame is None:
+                missed += 1
+            else:
+                latencies.append(frame - sent)
+            time.sleep(interval_ms / 1000)
+        harness.quit_loop()
+
+    driver = threading.Thread(target=drive, name="benchmark-driver", daemon=True)
+    driver.start()
+    app.run()
+    driver.join()
+    return {
+        "benchmark": "feedback_latency",
+        "notes": notes,
+        "interval_ms": interval_ms,
+        "mode": f"fixed {fps} fps" if fps else "on demand",
+        "fps": fps,
+        "missed": missed,
+        "latency": harness.distribution([latency * 1000 for latency in latencies]),
+    }
+
+
+def describe(result):
+    latency = result["latency"]
+    if not latency["count"]:
+        return f"feedback latency ({result['mode']}): no answered notes ({result['missed']} missed)"
+    return (f"feedback latency ({result['mode']}) over {latency['count']} notes: p50 {latency['p50_ms']} ms, "
+            f"p95 {latency['p95_ms']} ms, p99 {latency['p99_ms']} ms, max {latency['max_ms']} ms "
+            f"({result['missed']} missed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--interval", type=int, default=50, help="pause between notes in ms")
+    parser.add_argument("--fps", type=int, help="fixed frame rate instead of on-demand redraws")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+    harness.output(run(args.notes, args.interval, args.fps), args.json, describe)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Frame time distribution of PracticeApp.run and MainWindow.draw.
+
+PracticeApp runs headless for a few seconds fed by a SyntheticSource; every
+frame is timed from the loop deciding to redraw to the screen update, and the
+interval between frames is reported too. MainWindow.draw is then called
+repeatedly on each of its screens.
+
+    python benchmarks/frame_time.py
+    python benchmarks/frame_time.py --seconds 10 --rate 200 --fps 60 --json
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import harness
+
+
+def practice_frames(seconds=5.0, rate=50, fps=None):
+    from piano.midi.input import SyntheticSource
+
+    PracticeApp = harness.load_practice_app()
+    app = PracticeApp(fps=fps, source=SyntheticSource(rate, seed=1), db_path=None)
+    frames = harness.record_presents(app)
+    threading.Timer(seconds, harness.quit_loop).start()
+    app.run()
+    draw = [(end - start) * 1000 for start, end in frames]
+    interval = [(b[1] - a[1]) * 1000 for a, b in zip(frames, frames[1:])]
+    return {
+        "seconds": seconds,
+        "rate": rate,
+        "fps": fps,
+        "frames": len(frames),
+        "draw": harness.distribution(draw),
+        "interval": harness.distribution(interval),
+    }
+
+
+def window_draws(draws=300):
+    import pygame
+
+    from piano.core.attempts import AttemptStore
+    from piano.ui.screens import MainWindow
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        store = AttemptStore(os.path.join(directory, "attempts.sqlite3"))
+        for i in range(2000):
+            store.add(36 + i % 60, 36 + i % 60, i % 5 != 0, 400 + i % 700, time.time() - i * 600)
+        window = MainWindow(store=store)
+        for name in ["Home"] + list(window.screens):
+            # As on_menu_item_click, which also prints the click
+            window.active_screen = window.screens.get(name)
+            if hasattr(window.active_screen, "refresh"):
+                window.active_screen.refresh()
+            times = []
+            for _ in range(draws):
+                start = time.perf_counter()
+                window.draw()
+                times.append((time.perf_counter() - start) * 1000)
+            results[name] = harness.distribution(times)
+        store.close()
+        pygame.quit()
+    return results
+
+
+def run(seconds=5.0, rate=50, fps=None, draws=300):
+    return {
+        "benchmark": "frame_time",
+        "practice_app": practice_frames(seconds, rate, fps),
+        "main_window": window_draws(draws),
+    }
+
+
+def describe(result):
+    practice = result["practice_app"]
+    lines = [f"PracticeApp: {practice['frames']} frames in {practice['seconds']} s at {practice['rate']} events/s, "
+             f"draw p50 {practice['draw'].get('p50_ms')} ms, p99 {practice['draw'].get('p99_ms')} ms"]
+    for screen, times in result["main_window"].items():
+        lines.append(f"MainWindow.draw ({screen}): p50 {times['p50_ms']} ms, p99 {times['p99_ms']} ms")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate", type=int, default=50, help="synthetic MIDI events per second")
+    parser.add_argument("--fps", type=int, help="fixed frame rate instead of on-demand redraws")
+    parser.add_argument("--draws", type=int, default=300, help="MainWindow.draw calls per screen")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+    harness.output(run(args.seconds, args.rate, args.fps, args.draws), args.json, describe)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Shared helpers of the benchmarks: headless pygame, the practice app and result output.
+
+Importing this module selects SDL's dummy video and audio drivers, so every
+benchmark runs without a display, a sound card or a MIDI device.
+"""
+
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRACTICE_SCRIPT = os.path.join(ROOT, "midi_pkg", "02_practice.py")
+
+
+def load_practice_app():
+    """PracticeApp class from midi_pkg/02_practice.py, which is a script and not importable by name."""
+    spec = importlib.util.spec_from_file_location("practice_script", PRACTICE_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.PracticeApp
+
+
+def quit_loop():
+    """Make a running pygame loop exit, safe to call from any thread."""
+    import pygame
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+
+def record_presents(app):
+    """Wrap `app.renderer.present`, returns the list of (start, end) perf_counter times of each frame.
+
+    A frame starts when the loop decides to redraw and ends once the screen is updated.
+    """
+    frames = []
+    scheduler, renderer = app.scheduler, app.renderer
+    needs_redraw, present = scheduler.needs_redraw, renderer.present
+    started = [0.0]
+
+    def timed_needs_redraw():
+        redraw = needs_redraw()
+        if redraw:
+            started[0] = time.perf_counter()
+        return redraw
+
+    def timed_present(*args, **kwargs):
+        result = present(*args, **kwargs)
+        frames.append((started[0], time.perf_counter()))
+        return result
+
+    scheduler.needs_redraw = timed_needs_redraw
+    renderer.present = timed_present
+    return frames
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of `values`, None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+def distribution(values_ms):
+    """Summary of a list of durations in milliseconds."""
+    if not values_ms:
+        return {"count": 0}
+    return {
+        "count": len(values_ms),
+        "mean_ms": round(statistics.fmean(values_ms), 3),
+        "p50_ms": round(percentile(values_ms, 50), 3),
+        "p95_ms": round(percentile(values_ms, 95), 3),
+        "p99_ms": round(percentile(values_ms, 99), 3),
+        "max_ms": round(max(values_ms), 3),
+    }
+
+
+def environment():
+    """What the results depend on: commit, Python and platform."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def output(result, as_json, describe):
+    """Print `result` as JSON, or as the text `describe(result)` returns."""
+    if as_json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    else:
+        print(describe(result))
@@ -0,0 +1,59 @@
+"""Import-time benchmark of the piano package.
+
+Runs `python -X importtime -c "import <module>"` several times in a scratch
+directory and reports the median cumulative import time of the module, and
+whether importing it created any file.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module piano.core.logger --runs 20 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+def import_time_us(module, cwd):
+    """Cumulative import time of `module` in microseconds, from one fresh interpreter."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=cwd, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if line.startswith("import time:") and line.rsplit("|", 1)[-1].strip() == module:
+            return int(line.split("|")[1])
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def run(module="piano", runs=10):
+    with tempfile.TemporaryDirectory() as cwd:
+        times = [import_time_us(module, cwd) for _ in range(runs)]
+        created = sorted(os.listdir(cwd))
+    return {
+        "module": module,
+        "runs": runs,
+        "median_us": statistics.median(times),
+        "min_us": min(times),
+        "created_files": created,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="piano")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+    result = run(args.module, args.runs)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"import {result['module']}: median {result['median_us']} us, min {result['min_us']} us "
+              f"over {result['runs']} runs, files created: {result['created_files'] or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Run every benchmark and save the results as one JSON file.
+
+Results carry the commit they were measured on. `--compare` prints the change
+of every timing against an earlier results file, e.g. from the previous
+commit:
+
+    python benchmarks/run_all.py --output before.json
+    python benchmarks/run_all.py --output after.json --compare before.json
+    python benchmarks/run_all.py --quick
+"""
+
+import argparse
+import json
+
+import event_throughput
+import feedback_latency
+import frame_time
+import harness
+import import_time
+import startup_time
+
+
+def run(quick=False):
+    results = {"environment": harness.environment()}
+    results["import_time"] = import_time.run("piano", runs=3 if quick else 10)
+    results["startup_time"] = startup_time.run(runs=2 if quick else 5)
+    results["feedback_latency"] = feedback_latency.run(notes=50 if quick else 200)
+    results["frame_time"] = frame_time.run(seconds=2.0 if quick else 5.0, draws=100 if quick else 300)
+    results["event_throughput"] = event_throughput.run(seconds=1.0 if quick else 2.0)
+    return results
+
+
+def flatten(result, prefix=""):
+    """{"a.b.c": number} for every number of a nested result."""
+    values = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+
+def compare(old, new):
+    """Lines comparing the timings (keys ending in _ms or _us) and rates of two results."""
+    old_values, new_values = flatten(old), flatten(new)
+    lines = [f"{old['environment']['commit']} -> {new['environment']['commit']}"]
+    for name, value in new_values.items():
+        if name not in old_values or not name.endswith(("_ms", "_us", "_rate", "per_second")):
+            continue
+        before = old_values[name]
+        change = f"{(value - before) / before:+.1%}" if before else "n/a"
+        lines.append(f"{name:<55} {before:>12} -> {value:<12} {change}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", metavar="FILE", help="save the results to FILE instead of printing them")
+    parser.add_argument("--compare", metavar="FILE", help="compare with the results saved in FILE")
+    parser.add_argument("--quick", action="store_true", help="fewer runs, for a fast check")
+    args = parser.parse_args()
+    results = run(args.quick)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Startup time of the practice app, from a fresh interpreter to its first frame.
+
+Each run starts a new Python process which builds PracticeApp headless, draws
+one frame and exits. Reported are the time to the first frame measured inside
+the process (imports included) and the wall time of the whole process.
+
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --runs 10 --json
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+START = time.perf_counter()
+
+import harness  # noqa: E402  (after START, its imports are part of the startup)
+
+
+def child():
+    """Build the app, draw the first frame and print the elapsed ms."""
+    from piano.midi.input import SyntheticSource
+
+    PracticeApp = harness.load_practice_app()
+    app = PracticeApp(source=SyntheticSource(0), db_path=None)
+    frames = harness.record_presents(app)
+    harness.quit_loop()  # The loop still draws its first frame before exiting
+    app.run()
+    print(round((frames[0][1] - START) * 1000, 3))
+
+
+def run(runs=5):
+    first_frame, wall = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, __file__, "--child"],
+                                capture_output=True, text=True, check=True)
+        wall.append((time.perf_counter() - start) * 1000)
+        first_frame.append(float(result.stdout.split()[-1]))
+    return {
+        "benchmark": "startup_time",
+        "runs": runs,
+        "first_frame_median_ms": round(statistics.median(first_frame), 3),
+        "process_median_ms": round(statistics.median(wall), 3),
+    }
+
+
+def describe(result):
+    return (f"startup: first frame after {result['first_frame_median_ms']} ms, "
+            f"whole process {result['process_median_ms']} ms (median of {result['runs']} runs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+    else:
+        harness.output(run(args.runs), args.json, describe)
+
+
+if __name__ == "__main__":
+    main()
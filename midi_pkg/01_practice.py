@@ -2,30 +2,18 @@ import pygame
 import pygame.midi
 import random
 
-NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-OCTAVES = list(range(2, 7))  # Octaves 2 to 6
-WHITE_KEY_INDICES = [0, 2, 4, 5, 7, 9, 11]  # Indices for C, D, E, F, G, A, B
-
-FRENCH_NOTE_NAMES = {
-    'C': 'Do',
-    'D': 'Ré',
-    'E': 'Mi',
-    'F': 'Fa',
-    'G': 'Sol',
-    'A': 'La',
-    'B': 'Si'
-}
+from piano.core.practice import AttemptStatus, PracticeHistory
+from piano.midi.input import MidiDecoder, MidiInput, NoteOn
+from piano.midi.notes import WHITE_KEY_INDICES, get_french_note, note_to_string
 
-def note_to_string(note_number):
-    note_name = NOTE_NAMES[note_number % 12]
-    octave = (note_number // 12) - 1
-    return f"{note_name}{octave}"
+OCTAVES = list(range(2, 7))  # Octaves 2 to 6
 
-def get_french_note(note_number):
-    note_name = NOTE_NAMES[note_number % 12]
-    if len(note_name) == 1 and note_name in FRENCH_NOTE_NAMES:
-        return FRENCH_NOTE_NAMES[note_name]
-    return note_name  # fallback for sharps
+STATUS_COLORS = {
+    AttemptStatus.PENDING: (255, 255, 255),
+    AttemptStatus.SUCCESS: (0, 255, 0),
+    AttemptStatus.ERROR: (255, 0, 0),
+}
+VISIBLE_LINES = 8
 
 def get_notes_for_octaves(selected_octaves, only_white_keys):
     notes = []
@@ -43,13 +31,13 @@ def random_note(selected_octaves, only_white_keys):
 
 def main():
     pygame.init()
-    pygame.midi.init()
-    input_id = pygame.midi.get_default_input_id()
-    if input_id == -1:
-        print("No MIDI input device found.")
+    try:
+        # Drained on its own thread, the frame rate no longer limits how fast notes are read
+        midi_input = MidiInput().start()
+    except RuntimeError as e:
+        print(e)
         return
-
-    midi_input = pygame.midi.Input(input_id)
+    decoder = MidiDecoder(kinds=(NoteOn,))
     width, height = 800, 550
     header_height = 60
     screen = pygame.display.set_mode((width, height))
@@ -75,7 +63,7 @@ def main():
     for i, octave in enumerate(OCTAVES):
         checkbox_rects[octave] = pygame.Rect(start_x + i * spacing, 18, box_size, box_size)
 
-    lines = []
+    history = PracticeHistory()
     running = True
     def make_request_str(note):
         base = f"Play: {note_to_string(note)}"
@@ -84,8 +72,7 @@ def main():
         return base
 
     current_note = random_note([oct for oct, sel in selected_octaves.items() if sel], white_keys_only)
-    request_str = make_request_str(current_note)
-    lines.append(request_str)
+    history.add_prompt(current_note, midi_input.time(), make_request_str(current_note))
     show_checkmark = False
     checkmark_timer = 0
 
@@ -114,27 +101,19 @@ def main():
         if header_changed:
             allowed_octaves = [oct for oct, sel in selected_octaves.items() if sel]
             current_note = random_note(allowed_octaves, white_keys_only)
-            request_str = make_request_str(current_note)
-            lines.append((request_str, "normal"))
+            history.add_prompt(current_note, midi_input.time(), make_request_str(current_note))
 
         if midi_input.poll():
-            midi_events = midi_input.read(10)
-            for event in midi_events:
-                data, timestamp = event
-                status, note, velocity, _ = data
-                if status == 144 and velocity > 0:
-                    pressed_str = note_to_string(note)
-                    if note == current_note:
-                        lines[-1] = (f"{request_str} | You played: {pressed_str}", "success")
-                        show_checkmark = True
-                        checkmark_timer = pygame.time.get_ticks()
-                        allowed_octaves = [oct for oct, sel in selected_octaves.items() if sel]
-                        current_note = random_note(allowed_octaves, white_keys_only)
-                        request_str = make_request_str(current_note)
-                        lines.append((request_str, "normal"))
-                    else:
-                        lines[-1] = (f"{request_str} | You played: {pressed_str} (error)", "error")
-                        lines.append((request_str, "normal"))
+            for message in midi_input.read_messages(decoder):
+                if message.note == current_note:
+                    history.resolve(message.note, AttemptStatus.SUCCESS, message.timestamp)
+                    show_checkmark = True
+                    checkmark_timer = pygame.time.get_ticks()
+                    allowed_octaves = [oct for oct, sel in selected_octaves.items() if sel]
+                    current_note = random_note(allowed_octaves, white_keys_only)
+                else:
+                    history.resolve(message.note, AttemptStatus.ERROR, message.timestamp)
+                history.add_prompt(current_note, midi_input.time(), make_request_str(current_note))
 
         screen.fill((40, 40, 40))
         pygame.draw.rect(screen, (220, 220, 220), (0, 0, width, header_height))
@@ -158,24 +137,14 @@ def main():
         label = header_font.render("Show French note", True, (0, 0, 0))
         screen.blit(label, (french_note_checkbox_rect.x + box_size + 8, french_note_checkbox_rect.y - 2))
 
-        for i, line_data in enumerate(lines[-8:]):
-            if isinstance(line_data, tuple):
-                line, status = line_data
-            else:
-                line, status = line_data, "normal"
-            if status == "success":
-                color = (0, 255, 0)
-            elif status == "error":
-                color = (255, 0, 0)
-            else:
-                color = (255, 255, 255)
-            text_surface = small_font.render(line, True, color)
+        for i, (line, status) in enumerate(history.lines(VISIBLE_LINES, make_request_str, note_to_string)):
+            text_surface = small_font.render(line, True, STATUS_COLORS[status])
             screen.blit(text_surface, (30, header_height + 20 + i * 40))
 
         if show_checkmark:
             if pygame.time.get_ticks() - checkmark_timer < 1000:
                 check_surface = font.render("✔", True, (0, 200, 0))
-                screen.blit(check_surface, (600, header_height + 20 + (len(lines[-8:]) - 2) * 40))
+                screen.blit(check_surface, (600, header_height + 20 + (min(len(history), VISIBLE_LINES) - 2) * 40))
             else:
                 show_checkmark = False
 
@@ -1,55 +1,88 @@
+import argparse
+
 import pygame
 import pygame.midi
-import random
 
-NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+from piano.core.attempts import DEFAULT_DB_PATH, AttemptStore
+from piano.core.chords import (INVERSION_NAMES, SEVENTHS, TRIADS, ChordTarget, ChordTracker, note_mask,
+                               pitch_classes)
+from piano.core.practice import (AdaptiveSelector, AttemptStatus, NotePool, PracticeHistory,
+                                 ReactionStats, ScoreFollower)
+from piano.core.session import SessionReader, SessionRecorder
+from piano.midi.input import MidiDecoder, MidiInput, NoteOff, NoteOn, ReplaySource, SyntheticSource
+from piano.midi.notes import get_french_note, note_to_string
+from piano.midi.output import MidiOutput
+from piano.midi.smf import MidiFile
+from piano.ui.heatmap import KeyHeatmap
+from piano.ui.loop import FrameScheduler
+from piano.ui.render import DirtyRenderer
+from piano.ui.sound import SoundBank, pre_init
+from piano.ui.text import render_text
+from piano.ui.widgets import KEY_NORMAL, KEY_PRESSED, KEY_TARGET, Checkbox, KeyboardWidget
+
 OCTAVES = list(range(2, 7))
-WHITE_KEY_INDICES = [0, 2, 4, 5, 7, 9, 11]
-FRENCH_NOTE_NAMES = {
-    'C': 'Do', 'D': 'Ré', 'E': 'Mi', 'F': 'Fa',
-    'G': 'Sol', 'A': 'La', 'B': 'Si'
+STATUS_COLORS = {
+    AttemptStatus.PENDING: (255, 255, 255),
+    AttemptStatus.SUCCESS: (0, 255, 0),
+    AttemptStatus.ERROR: (255, 0, 0),
 }
-
-class Checkbox:
-    def __init__(self, rect, label, checked=True):
-        self.rect = rect
-        self.label = label
-        self.checked = checked
-
-    def draw(self, surface, font, box_size=18):
-        pygame.draw.rect(surface, (180, 180, 180), self.rect)
-        if self.checked:
-            pygame.draw.rect(surface, (0, 120, 0), self.rect.inflate(-6, -6))
-        label_surface = font.render(self.label, True, (0, 0, 0))
-        surface.blit(label_surface, (self.rect.x + box_size + 6, self.rect.y - 2))
-
-    def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if self.rect.collidepoint(event.pos):
-                self.checked = not self.checked
-                return True
-        return False
+LINE_HEIGHT = 40
+KEYBOARD_HEIGHT = 90
+FOOTER_HEIGHT = 50
 
 class PracticeApp:
-    def __init__(self):
+    def __init__(self, fps=None, source=None, record_path=None, sound=False, midi_out=False, thru=False,
+                 melody=None, db_path=DEFAULT_DB_PATH):
+        if sound:
+            pre_init()
         pygame.init()
-        pygame.midi.init()
-        self.input_id = pygame.midi.get_default_input_id()
-        if self.input_id == -1:
-            print("No MIDI input device found.")
+        self.sound = SoundBank() if sound else None
+        self.midi_output = None
+        if midi_out or thru:
+            try:
+                self.midi_output = MidiOutput()
+            except RuntimeError as e:
+                print(f"{e} Continuing without MIDI output.")
+        self.thru = thru and self.midi_output is not None
+        self.recorder = SessionRecorder(record_path) if record_path else None
+        self.store = AttemptStore(db_path) if db_path else None
+        self.scheduler = FrameScheduler(fps)
+        try:
+            self.midi_input = MidiInput(source, notify=self.scheduler.wakeup).start()
+        except RuntimeError as e:
+            print(f"{e} Use --synthetic to practice without a keyboard.")
             exit()
-        self.midi_input = pygame.midi.Input(self.input_id)
         self.width, self.height = 800, 550
         self.header_height = 60
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        self.screen = pygame.display.set_mode((self.width, self.height), pygame.RESIZABLE)
+        self.renderer = DirtyRenderer(self.screen)
         pygame.display.set_caption("Practice Notes")
         self.font = pygame.font.SysFont(None, 48)
         self.small_font = pygame.font.SysFont(None, 36)
         self.header_font = pygame.font.SysFont(None, int(22 * 0.75))
-        self.clock = pygame.time.Clock()
-        self.lines = []
+        self.history = PracticeHistory()
+        self.reaction_stats = ReactionStats()
+        self.midi_decoder = MidiDecoder(kinds=(NoteOn, NoteOff))
+        self.chord_tracker = ChordTracker()
         self.show_checkmark = False
         self.checkmark_timer = 0
+        self.checkmark_rect = pygame.Rect(0, 0, 0, 0)
+
+        self.layout()
+
+        # On-screen keyboard, keys can also be played with the mouse
+        self.keyboard = KeyboardWidget(self.keyboard_area.inflate(-20, -4))
+        # Accuracy and reaction time per key, toggled with the H key
+        self.heatmap = KeyHeatmap(self.keyboard)
+        self.show_heatmap = False
+        self.keyboard_stale = False  # Whole keyboard to redraw, e.g. to clear the overlay
+        if self.store:
+            self.heatmap.seed(self.store.note_stats())
+        self.pressed_keys = set()
+        self.changed_keys = set()
+        self.mouse_key = None
+        self.current_note = None  # A MIDI note or a ChordTarget
+        self.target_notes = ()    # Keys to play for it
 
         # Octave checkboxes
         self.octave_checkboxes = []
@@ -63,123 +96,341 @@ class PracticeApp:
         self.white_key_checkbox = Checkbox(pygame.Rect(600, 18, 18, 18), "White keys only", True)
         # French note checkbox
         self.french_note_checkbox = Checkbox(pygame.Rect(720, 18, 18, 18), "Show French note", True)
+        # Chord prompt checkboxes, inversions apply to the selected chord kinds
+        self.triads_checkbox = Checkbox(pygame.Rect(490, 18, 18, 18), "Triads", False)
+        self.sevenths_checkbox = Checkbox(pygame.Rect(490, 40, 18, 18), "Sevenths", False)
+        self.inversions_checkbox = Checkbox(pygame.Rect(600, 40, 18, 18), "Inversions", False)
+        self.chord_checkboxes = (self.triads_checkbox, self.sevenths_checkbox, self.inversions_checkbox)
+
+        self.note_pool = NotePool(self.get_selected_octaves(), self.white_key_checkbox.checked)
+        self.selector = AdaptiveSelector(self.note_pool)
+        # Play-along mode: prompts follow the melody instead of the selector
+        self.follower = ScoreFollower(melody) if melody else None
+        if self.sound:
+            self.sound.prefetch(self.keyboard.key_rects)
+        self.new_prompt()
+
+    def new_prompt(self, note=None):
+        previous_notes = self.target_notes
+        self.current_note = self.generate_note() if note is None else note
+        if self.current_note is None:
+            # Play-along piece finished, nothing left to ask for
+            self.target_notes = ()
+            for key in previous_notes:
+                self.refresh_key(key)
+            self.invalidate(self.footer_rect)
+            return
+        chord = isinstance(self.current_note, ChordTarget)
+        self.target_notes = self.current_note.notes() if chord else (self.current_note,)
+        self.chord_tracker.new_gesture()
+        for key in set(previous_notes) | set(self.target_notes):
+            self.refresh_key(key)
+        if self.sound:
+            for key in self.target_notes:
+                self.sound.play(key)
+        if self.midi_output:
+            self.midi_output.schedule([(key, 100, 0, 500) for key in self.target_notes])
+        # Same clock as the timestamps of incoming MIDI events
+        self.prompt_time = self.midi_input.time()
+        self.history.add_prompt(self.target_notes[0], self.prompt_time, self.make_request_str(self.current_note))
+        if self.recorder:
+            self.recorder.record_prompt(self.current_note, self.prompt_time)
 
-        self.current_note = self.generate_note()
-        self.request_str = self.make_request_str(self.current_note)
-        self.lines.append((self.request_str, "normal"))
+    def layout(self):
+        """Place the screen sections, redrawn independently, for the current window size."""
+        self.width, self.height = self.screen.get_size()
+        history_height = max(self.height - self.header_height - KEYBOARD_HEIGHT - FOOTER_HEIGHT, 2 * LINE_HEIGHT)
+        self.header_rect = pygame.Rect(0, 0, self.width, self.header_height)
+        self.history_rect = pygame.Rect(0, self.header_height, self.width, history_height)
+        self.keyboard_area = pygame.Rect(0, self.history_rect.bottom, self.width, KEYBOARD_HEIGHT)
+        self.footer_rect = pygame.Rect(0, self.keyboard_area.bottom, self.width, FOOTER_HEIGHT)
+        self.visible_lines = (history_height - 20) // LINE_HEIGHT
 
     def get_selected_octaves(self):
         return [OCTAVES[i] for i, cb in enumerate(self.octave_checkboxes) if cb.checked]
 
     def generate_note(self):
-        selected_octaves = self.get_selected_octaves()
-        only_white_keys = self.white_key_checkbox.checked
-        notes = []
-        for octave in selected_octaves:
-            base = (octave + 1) * 12
-            if only_white_keys:
-                notes.extend([base + i for i in WHITE_KEY_INDICES])
-            else:
-                notes.extend(range(base, base + 12))
-        return random.choice(notes) if notes else 60
-
-    def note_to_string(self, note_number):
-        note_name = NOTE_NAMES[note_number % 12]
-        octave = (note_number // 12) - 1
-        return f"{note_name}{octave}"
-
-    def get_french_note(self, note_number):
-        note_name = NOTE_NAMES[note_number % 12]
-        if len(note_name) == 1 and note_name in FRENCH_NOTE_NAMES:
-            return FRENCH_NOTE_NAMES[note_name]
-        return note_name
+        """Next prompt, None once a play-along piece is finished."""
+        if self.follower:
+            return self.follower.expected()
+        return self.selector.next()
 
     def make_request_str(self, note):
-        base = f"Play: {self.note_to_string(note)}"
+        if isinstance(note, ChordTarget):
+            return f"Play: {note_to_string(note.root)} {note.quality}, {INVERSION_NAMES[note.inversion]}"
+        base = f"Play: {note_to_string(note)}"
         if self.french_note_checkbox.checked:
-            base += f" ({self.get_french_note(note)})"
+            base += f" ({get_french_note(note)})"
         return base
 
+    def invalidate(self, rect):
+        self.renderer.invalidate(rect)
+        self.scheduler.mark_dirty()
+
+    def refresh_key(self, note):
+        if note in self.pressed_keys:
+            state = KEY_PRESSED
+        elif note in self.target_notes:
+            state = KEY_TARGET
+        else:
+            state = KEY_NORMAL
+        key_rect = self.keyboard.set_key(note, state)
+        if key_rect is not None:
+            self.changed_keys.add(note)
+            self.invalidate(key_rect)
+
+    def press_key(self, note, timestamp, velocity=100):
+        self.pressed_keys.add(note)
+        self.chord_tracker.note_on(note, timestamp)
+        if self.sound:
+            self.sound.play(note, velocity)
+        if self.follower and self.current_note is not None:
+            self.follower.follow(note)
+        self.handle_midi_event(note, timestamp)
+        self.refresh_key(note)
+
+    def release_key(self, note):
+        self.pressed_keys.discard(note)
+        self.chord_tracker.note_off(note)
+        self.refresh_key(note)
+
     def handle_header_event(self, event):
         header_changed = False
-        for cb in self.octave_checkboxes:
+        for octave, cb in zip(OCTAVES, self.octave_checkboxes):
             if cb.handle_event(event):
                 if not any(c.checked for c in self.octave_checkboxes):
                     # Always keep at least Oct4 selected
                     self.octave_checkboxes[2].checked = True
+                    self.note_pool.set_octave(OCTAVES[2], True)
+                    self.invalidate(self.octave_checkboxes[2].bounds)
+                self.note_pool.set_octave(octave, cb.checked)
+                self.invalidate(cb.bounds)
                 header_changed = True
         if self.white_key_checkbox.handle_event(event):
+            self.note_pool.set_white_keys_only(self.white_key_checkbox.checked)
+            self.invalidate(self.white_key_checkbox.bounds)
             header_changed = True
         if self.french_note_checkbox.handle_event(event):
+            self.invalidate(self.french_note_checkbox.bounds)
+            header_changed = True
+        chords_changed = False
+        for cb in self.chord_checkboxes:
+            if cb.handle_event(event):
+                self.invalidate(cb.bounds)
+                chords_changed = True
+        if chords_changed:
+            qualities = ((TRIADS if self.triads_checkbox.checked else ())
+                         + (SEVENTHS if self.sevenths_checkbox.checked else ()))
+            inversions = (0, 1, 2, 3) if self.inversions_checkbox.checked else (0,)
+            self.note_pool.set_chords(qualities, inversions)
             header_changed = True
         return header_changed
 
-    def handle_midi_event(self, note):
-        pressed_str = self.note_to_string(note)
-        if note == self.current_note:
-            self.lines[-1] = (f"{self.request_str} | You played: {pressed_str}", "success")
+    def check_answer(self, note):
+        """True or False once the prompt is answered, None while a chord is still incomplete."""
+        target = self.current_note
+        if not isinstance(target, ChordTarget):
+            return note == target
+        gesture = self.chord_tracker.gesture
+        if target.matches(gesture):
+            return True
+        wrong_key = pitch_classes(gesture) & ~pitch_classes(note_mask(self.target_notes))
+        if wrong_key or gesture.bit_count() >= len(self.target_notes):
+            return False
+        return None
+
+    def handle_midi_event(self, note, timestamp):
+        if self.current_note is None:
+            return  # Piece finished
+        correct = self.check_answer(note)
+        if correct is None:
+            return
+        self.invalidate(self.history_rect)
+        self.invalidate(self.footer_rect)
+        latency = max(timestamp - self.prompt_time, 0)
+        self.selector.record(self.current_note, correct, latency)
+        if not isinstance(self.current_note, ChordTarget):
+            # Per-key statistics only count single note prompts
+            if self.store:
+                self.store.add(self.current_note, note, correct, latency)
+            self.heatmap.add(self.current_note, correct, latency)
+            if self.show_heatmap:
+                self.invalidate(self.keyboard_area)
+        if correct:
+            self.history.resolve(note, AttemptStatus.SUCCESS, timestamp)
+            self.reaction_stats.add(latency)
             self.show_checkmark = True
             self.checkmark_timer = pygame.time.get_ticks()
-            self.current_note = self.generate_note()
-            self.request_str = self.make_request_str(self.current_note)
-            self.lines.append((self.request_str, "normal"))
+            self.scheduler.wake_in(1000)  # Only to hide the checkmark, it does not move
+            self.new_prompt()
         else:
-            self.lines[-1] = (f"{self.request_str} | You played: {pressed_str} (error)", "error")
-            self.lines.append((self.request_str, "normal"))
+            self.history.resolve(note, AttemptStatus.ERROR, timestamp)
+            # The follower may have moved on (skipped or extra note), ask for what it expects
+            self.new_prompt(None if self.follower else self.current_note)
 
     def draw_header(self):
-        pygame.draw.rect(self.screen, (220, 220, 220), (0, 0, self.width, self.header_height))
+        pygame.draw.rect(self.screen, (220, 220, 220), self.header_rect)
         for cb in self.octave_checkboxes:
             cb.draw(self.screen, self.header_font)
         self.white_key_checkbox.draw(self.screen, self.header_font)
         self.french_note_checkbox.draw(self.screen, self.header_font)
+        for cb in self.chord_checkboxes:
+            cb.draw(self.screen, self.header_font)
 
     def draw_lines(self):
-        for i, line_data in enumerate(self.lines[-8:]):
-            line, status = line_data if isinstance(line_data, tuple) else (line_data, "normal")
-            color = (0, 255, 0) if status == "success" else (255, 0, 0) if status == "error" else (255, 255, 255)
-            text_surface = self.small_font.render(line, True, color)
-            self.screen.blit(text_surface, (30, self.header_height + 20 + i * 40))
+        pygame.draw.rect(self.screen, (40, 40, 40), self.history_rect)
+        lines = self.history.lines(self.visible_lines, self.make_request_str, note_to_string)
+        for i, (line, status) in enumerate(lines):
+            text_surface = render_text(self.small_font, line, True, STATUS_COLORS[status])
+            self.screen.blit(text_surface, (30, self.header_height + 20 + i * LINE_HEIGHT))
 
-    def draw_checkmark(self):
-        if self.show_checkmark and pygame.time.get_ticks() - self.checkmark_timer < 1000:
-            check_surface = self.font.render("✔", True, (0, 200, 0))
-            self.screen.blit(check_surface, (600, self.header_height + 20 + (len(self.lines[-8:]) - 2) * 40))
-        elif self.show_checkmark:
+    def toggle_heatmap(self):
+        self.show_heatmap = not self.show_heatmap and self.heatmap.enabled
+        self.keyboard_stale = True
+        self.invalidate(self.keyboard_area)
+
+    def draw_keyboard(self):
+        # The overlay is blended over the keys, with it the whole keyboard is redrawn,
+        # and once more when it is hidden to clear it
+        if self.renderer.full or self.show_heatmap or self.keyboard_stale:
+            self.keyboard_stale = False
+            pygame.draw.rect(self.screen, (40, 40, 40), self.keyboard_area)
+            self.keyboard.draw(self.screen)
+            if self.show_heatmap:
+                self.heatmap.draw(self.screen)
+        else:
+            self.keyboard.draw_keys(self.screen, self.changed_keys)
+        self.changed_keys.clear()
+
+    def draw_stats(self):
+        pygame.draw.rect(self.screen, (40, 40, 40), self.footer_rect)
+        median = self.reaction_stats.median()
+        parts = []
+        if self.follower:
+            progress = ("finished" if self.current_note is None
+                        else f"{self.follower.position}/{len(self.follower.reference)}")
+            parts.append(f"Piece: {progress}"
+                         f" | accuracy {self.follower.accuracy():.0%}")
+        if median is not None:
+            parts.append(f"Reaction: median {median} ms | p95 {self.reaction_stats.p95()} ms"
+                         f" ({len(self.reaction_stats)} notes)")
+        if not parts:
+            return
+        text = " | ".join(parts)
+        stats_surface = render_text(self.header_font, text, True, (200, 200, 200))
+        self.screen.blit(stats_surface, stats_surface.get_rect(midleft=(30, self.footer_rect.centery)))
+
+    def update_checkmark(self):
+        if self.show_checkmark and pygame.time.get_ticks() - self.checkmark_timer >= 1000:
             self.show_checkmark = False
+            self.invalidate(self.checkmark_rect)
+
+    def draw_checkmark(self):
+        if self.show_checkmark:
+            check_surface = render_text(self.font, "✔", True, (0, 200, 0))
+            self.checkmark_rect = self.screen.blit(
+                check_surface, (600, self.header_height + 20 + (min(len(self.history), self.visible_lines) - 2) * LINE_HEIGHT))
 
     def run(self):
         running = True
         while running:
-            header_changed = False
-            for event in pygame.event.get():
+            for event in self.scheduler.wait_events():
                 if event.type == pygame.QUIT:
                     running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Not the mouse wheel
                     if self.handle_header_event(event):
-                        self.current_note = self.generate_note()
-                        self.request_str = self.make_request_str(self.current_note)
-                        self.lines.append((self.request_str, "normal"))
-                        header_changed = True
+                        self.new_prompt()
+                        self.invalidate(self.history_rect)
+                    self.mouse_key = self.keyboard.key_at(event.pos)
+                    if self.mouse_key is not None:
+                        self.press_key(self.mouse_key, self.midi_input.time())
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                    self.toggle_heatmap()
+                elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.mouse_key is not None:
+                    self.release_key(self.mouse_key)
+                    self.mouse_key = None
+                elif event.type == pygame.VIDEORESIZE:
+                    self.screen = pygame.display.get_surface()
+                    self.layout()
+                    self.keyboard.resize(self.keyboard_area.inflate(-20, -4))
+                    self.renderer.resize(self.screen)
+                    self.scheduler.mark_dirty()
+                elif event.type == pygame.VIDEOEXPOSE:
+                    self.renderer.invalidate_all()
+                    self.scheduler.mark_dirty()
 
             if self.midi_input.poll():
-                midi_events = self.midi_input.read(10)
-                for event in midi_events:
-                    data, timestamp = event
-                    status, note, velocity, _ = data
-                    if status == 144 and velocity > 0:
-                        self.handle_midi_event(note)
-
-            self.screen.fill((40, 40, 40))
-            self.draw_header()
-            self.draw_lines()
-            self.draw_checkmark()
-            pygame.display.flip()
-            self.clock.tick(60)
+                midi_events = self.midi_input.read()
+                if self.recorder:
+                    self.recorder.record_events(midi_events)
+                if self.thru:
+                    self.midi_output.thru(midi_events)
+                for message in self.midi_decoder.decode(midi_events):
+                    if type(message) is NoteOn:
+                        self.press_key(message.note, message.timestamp, message.velocity)
+                    else:
+                        self.release_key(message.note)
+
+            self.update_checkmark()
+            if not self.scheduler.needs_redraw():
+                continue
+            if self.renderer.needs(self.header_rect):
+                self.draw_header()
+            if self.renderer.needs(self.history_rect):
+                self.draw_lines()
+                self.draw_checkmark()
+            if self.renderer.needs(self.keyboard_area):
+                self.draw_keyboard()
+            if self.renderer.needs(self.footer_rect):
+                self.draw_stats()
+            self.renderer.present()
 
         self.midi_input.close()
+        if self.recorder:
+            self.recorder.close()
+        if self.store:
+            self.store.close()
+        if self.midi_output:
+            self.midi_output.close()
         pygame.midi.quit()
         pygame.quit()
 
 if __name__ == "__main__":
-    PracticeApp().run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Practice finding notes on a MIDI keyboard.")
+    parser.add_argument("--fps", type=int, help="redraw at a fixed frame rate instead of on demand")
+    parser.add_argument("--synthetic", type=float, metavar="RATE",
+                        help="feed RATE random MIDI events per second instead of a keyboard")
+    parser.add_argument("--sound", action="store_true", help="play prompted and pressed notes (needs NumPy)")
+    parser.add_argument("--midi-out", action="store_true", help="play prompted notes on the MIDI output device")
+    parser.add_argument("--thru", action="store_true", help="echo MIDI input to the MIDI output device")
+    parser.add_argument("--record", metavar="FILE", help="save MIDI events and prompts to a session file")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recorded session file instead of a keyboard")
+    parser.add_argument("--export-mid", metavar="FILE",
+                        help="on exit, save the --record (or else --replay) session as a MIDI file (.mid)")
+    parser.add_argument("--db", metavar="FILE",
+                        help=f"save attempts to this SQLite database (default {DEFAULT_DB_PATH}, none with"
+                             " --synthetic or --replay), '' to disable")
+    parser.add_argument("--follow", metavar="FILE", help="play along the melody of a MIDI file (.mid)")
+    parser.add_argument("--channel", type=int, choices=range(1, 17), metavar="1-16",
+                        help="with --follow, channel of the melody (default every channel but drums, 10)")
+    args = parser.parse_args()
+    session_path = args.record or args.replay
+    if args.export_mid and not session_path:
+        parser.error("--export-mid needs --record or --replay")
+    source = None
+    if args.synthetic:
+        source = SyntheticSource(args.synthetic)
+    elif args.replay:
+        with SessionReader(args.replay) as session:
+            source = ReplaySource(session.midi_events(), name=args.replay)
+    db_path = args.db
+    if db_path is None:
+        # Generated or replayed attempts stay out of the real statistics
+        db_path = None if source else DEFAULT_DB_PATH
+    melody = list(MidiFile(args.follow).melody(args.channel)) if args.follow else None
+    PracticeApp(fps=args.fps, source=source, record_path=args.record, sound=args.sound,
+                midi_out=args.midi_out, thru=args.thru, melody=melody, db_path=db_path).run()
+    if args.export_mid:
+        with SessionReader(session_path) as session:
+            session.export_smf(args.export_mid)
+        print(f"Saved {session_path} as {args.export_mid}")
\ No newline at end of file
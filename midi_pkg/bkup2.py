@@ -2,12 +2,7 @@ import pygame
 import pygame.midi
 import random
 
-NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-
-def note_to_string(note_number):
-    note_name = NOTE_NAMES[note_number % 12]
-    octave = (note_number // 12) - 1
-    return f"{note_name}{octave}"
+from piano.midi.notes import note_to_string
 
 def random_note():
     # MIDI note numbers for piano range (A0=21 to C8=108)
@@ -2,14 +2,9 @@ import pygame
 import pygame.midi
 import random
 
-NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-OCTAVES = list(range(2, 7))  # Octaves 2 to 6
-WHITE_KEY_INDICES = [0, 2, 4, 5, 7, 9, 11]  # Indices for C, D, E, F, G, A, B
+from piano.midi.notes import WHITE_KEY_INDICES, note_to_string
 
-def note_to_string(note_number):
-    note_name = NOTE_NAMES[note_number % 12]
-    octave = (note_number // 12) - 1
-    return f"{note_name}{octave}"
+OCTAVES = list(range(2, 7))  # Octaves 2 to 6
 
 def get_notes_for_octaves(selected_octaves, only_white_keys):
     notes = []
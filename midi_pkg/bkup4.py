@@ -2,31 +2,9 @@ import pygame
 import pygame.midi
 import random
 
-NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+from piano.midi.notes import WHITE_KEY_INDICES, get_french_note, note_to_string
+
 OCTAVES = list(range(2, 7))  # Octaves 2 to 6
-WHITE_KEY_INDICES = [0, 2, 4, 5, 7, 9, 11]  # Indices for C, D, E, F, G, A, B
-
-FRENCH_NOTE_NAMES = {
-    'C': 'Do',
-    'D': 'Ré',
-    'E': 'Mi',
-    'F': 'Fa',
-    'G': 'Sol',
-    'A': 'La',
-    'B': 'Si'
-}
-
-def note_to_string(note_number):
-    note_name = NOTE_NAMES[note_number % 12]
-    octave = (note_number // 12) - 1
-    return f"{note_name}{octave}"
-
-def get_french_note(note_number):
-    note_name = NOTE_NAMES[note_number % 12]
-    # Only show for natural notes (no #)
-    if len(note_name) == 1 and note_name in FRENCH_NOTE_NAMES:
-        return FRENCH_NOTE_NAMES[note_name]
-    return note_name  # fallback for sharps
 
 def get_notes_for_octaves(selected_octaves, only_white_keys):
     notes = []
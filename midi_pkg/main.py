@@ -1,32 +1,24 @@
 import pygame.midi
 
-NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-
-def note_to_string(note_number):
-    note_name = NOTE_NAMES[note_number % 12]
-    octave = (note_number // 12) - 1
-    return f"{note_name}{octave}"
+from piano.midi.input import MidiDecoder, MidiInput, NoteOn
+from piano.midi.notes import note_to_string
 
 def main():
-    pygame.midi.init()
-    input_id = pygame.midi.get_default_input_id()
-    if input_id == -1:
-        print("No MIDI input device found.")
+    try:
+        midi_input = MidiInput().start()
+    except RuntimeError as e:
+        print(e)
         return
 
-    midi_input = pygame.midi.Input(input_id)
     print("Listening for MIDI input. Press Ctrl+C to exit.")
+    decoder = MidiDecoder(kinds=(NoteOn,))
 
     try:
         while True:
-            if midi_input.poll():
-                midi_events = midi_input.read(10)
-                for event in midi_events:
-                    data, timestamp = event
-                    status, note, velocity, _ = data
-                    if status == 144 and velocity > 0:
-                        note_str = note_to_string(note)
-                        print(f"Note: {note} ({note_str}, {velocity})")
+            if midi_input.wait(0.5):
+                for message in midi_input.read_messages(decoder):
+                    note_str = note_to_string(message.note)
+                    print(f"Note: {message.note} ({note_str}, {message.velocity})")
     except KeyboardInterrupt:
         print("\nExiting...")
     finally:
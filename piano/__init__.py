@@ -1,15 +1,25 @@
-import tomllib
-from pathlib import Path
+"""Piano practicing application using a MIDI connection to a piano keyboard.
+
+Importing the package does no work: the version is read from the installed
+package metadata the first time `piano.__version__` is accessed.
+"""
+
+
+def __getattr__(name):
+    if name == "__version__":
+        from importlib.metadata import PackageNotFoundError, version as package_version
+        try:
+            value = package_version("piano")
+        except PackageNotFoundError:
+            raise RuntimeError("piano package is not installed properly. Check TOML file and use 'pip install -e .'") from None
+        globals()["__version__"] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-try:
-    from importlib.metadata import version, PackageNotFoundError
-    __version__ = version("piano")
-except PackageNotFoundError:
-    __version__ = None
-    raise RuntimeError("piano package is not installed properly. Check TOML file and use 'pip install -e .'")
 
 def version():
     """Display piano version information."""
-    print(f"piano version: {__version__}")
+    print(f"piano version: {__getattr__('__version__')}")
+
 
-__all__ = ["__version__"]
\ No newline at end of file
+__all__ = ["__version__"]
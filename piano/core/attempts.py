@@ -0,0 +1,190 @@
+"""Persistent store of practice attempts.
+
+Attempts are kept in a local SQLite database in WAL mode. `add` only puts the
+attempt on a queue; a writer thread inserts whatever is waiting in one
+transaction, so the UI thread never waits for the disk. Readers use their own
+connection and, thanks to WAL, never block the writer.
+
+Attempts are indexed by note and by day. The writer also keeps a summary
+row per (day, note) up to date in the same transaction, and aggregates are
+read from the summary: at most one row per note and day, so the statistics
+screen opens instantly even with years of history.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from piano.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_PATH = os.path.join('DATA', 'attempts.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    time REAL NOT NULL,
+    day INTEGER NOT NULL,
+    target INTEGER NOT NULL,
+    played INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    latency_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_by_note ON attempts(target);
+CREATE INDEX IF NOT EXISTS attempts_by_day ON attempts(day);
+CREATE TABLE IF NOT EXISTS note_days (
+    day INTEGER NOT NULL,
+    target INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    latency_ms INTEGER NOT NULL,
+    PRIMARY KEY (day, target)
+) WITHOUT ROWID;
+"""
+
+
+def _connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, no fsync per commit
+    return connection
+
+
+class AttemptStore:
+    """Records attempts of a practice session and answers statistics queries.
+
+    Query methods must be called from one thread (normally the UI thread),
+    `add` from any thread.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=256):
+        """Open (or create) the database at `path` and start a new session."""
+        self.path = path
+        self.batch_size = batch_size
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _connect(path) as connection:
+            connection.executescript(SCHEMA)
+            self.session_id = connection.execute(
+                "INSERT INTO sessions (started) VALUES (?)", (time.time(),)).lastrowid
+        connection.close()
+        self._reader = None
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="attempt-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, target, played, correct, latency_ms, timestamp=None):
+        """Queue one attempt, `timestamp` being epoch seconds (now when None)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        day = date.fromtimestamp(timestamp).toordinal()
+        self._queue.put((self.session_id, timestamp, day, target, played, int(correct), int(latency_ms)))
+
+    def _run(self):
+        connection = _connect(self.path)
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                rows = [item for item in batch if type(item) is tuple]
+                if rows:
+                    try:
+                        self._write(connection, rows)
+                    except sqlite3.Error as e:
+                        logger.error(f"[Stats] - Could not save {len(rows)} attempts: {e}")
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                if self._STOP in batch:
+                    return
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _write(connection, rows):
+        summary = {}  # (day, target) -> [attempts, correct, latency sum]
+        for _, _, day, target, _, correct, latency in rows:
+            totals = summary.setdefault((day, target), [0, 0, 0])
+            totals[0] += 1
+            totals[1] += correct
+            totals[2] += latency
+        with connection:
+            connection.executemany(
+                "INSERT INTO attempts (session_id, time, day, target, played, correct, latency_ms)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany(
+                "INSERT INTO note_days VALUES (?, ?, ?, ?, ?) ON CONFLICT (day, target) DO UPDATE SET"
+                " attempts = attempts + excluded.attempts, correct = correct + excluded.correct,"
+                " latency_ms = latency_ms + excluded.latency_ms",
+                [key + tuple(totals) for key, totals in summary.items()])
+
+    def flush(self):
+        """Wait until every queued attempt is written."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Write the queued attempts and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _query(self, sql, parameters=()):
+        if self._reader is None:
+            self._reader = _connect(self.path)
+        return self._reader.execute(sql, parameters).fetchall()
+
+    def note_stats(self):
+        """{note: (attempts, correct, mean latency ms)} over the whole history."""
+        rows = self._query("SELECT target, SUM(attempts), SUM(correct), SUM(latency_ms) * 1.0 / SUM(attempts)"
+                           " FROM note_days GROUP BY target")
+        return {note: (count, correct, mean) for note, count, correct, mean in rows}
+
+    def octave_stats(self, notes=None):
+        """{octave: (attempts, correct, mean latency ms)}, derived from `note_stats()` when not given."""
+        notes = self.note_stats() if notes is None else notes
+        octaves = {}
+        for note, (count, correct, mean) in notes.items():
+            total, hits, latency = octaves.get(note // 12 - 1, (0, 0, 0.0))
+            octaves[note // 12 - 1] = (total + count, hits + correct, latency + mean * count)
+        return {octave: (count, correct, latency / count)
+                for octave, (count, correct, latency) in sorted(octaves.items())}
+
+    def daily_trend(self, days=30):
+        """[(date, attempts, accuracy, mean latency ms)] for the days practiced among the last `days`."""
+        since = (date.today() - timedelta(days=days - 1)).toordinal()
+        rows = self._query("SELECT day, SUM(attempts), SUM(correct) * 1.0 / SUM(attempts),"
+                           " SUM(latency_ms) * 1.0 / SUM(attempts)"
+                           " FROM note_days WHERE day >= ? GROUP BY day ORDER BY day", (since,))
+        return [(date.fromordinal(day), count, accuracy, mean) for day, count, accuracy, mean in rows]
+
+    def totals(self):
+        """(attempts, accuracy) over the whole history."""
+        count, correct = self._query("SELECT SUM(attempts), SUM(correct) FROM note_days")[0]
+        return count or 0, correct / count if count else 0.0
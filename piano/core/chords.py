@@ -0,0 +1,179 @@
+"""Chord and interval recognition.
+
+Held keys are tracked as a 128-bit integer mask, one bit per MIDI note. A
+chord is identified by folding the mask into its 12 pitch classes, rotating
+it so the bass note comes first and looking the result up in a table built
+once from the chord templates, so recognition costs the same whatever the
+chord.
+"""
+
+from collections import namedtuple
+
+from piano.midi.notes import ENGLISH_NAMES
+
+# Intervals in semitones above the root, in root position
+CHORD_QUALITIES = {
+    'maj': (0, 4, 7),
+    'min': (0, 3, 7),
+    'dim': (0, 3, 6),
+    'aug': (0, 4, 8),
+    'sus2': (0, 2, 7),
+    'sus4': (0, 5, 7),
+    'maj7': (0, 4, 7, 11),
+    '7': (0, 4, 7, 10),
+    'min7': (0, 3, 7, 10),
+    'm7b5': (0, 3, 6, 10),
+    'dim7': (0, 3, 6, 9),
+}
+TRIADS = ('maj', 'min', 'dim', 'aug')
+SEVENTHS = ('maj7', '7', 'min7', 'm7b5', 'dim7')
+
+INTERVAL_NAMES = ('unison', 'minor 2nd', 'major 2nd', 'minor 3rd', 'major 3rd', 'perfect 4th',
+                  'tritone', 'perfect 5th', 'minor 6th', 'major 6th', 'minor 7th', 'major 7th',
+                  'octave')
+INVERSION_NAMES = ('root position', '1st inversion', '2nd inversion', '3rd inversion')
+
+PITCH_CLASS_MASK = 0xFFF
+
+
+def _rotate(pitch_classes, shift):
+    """Rotate a 12-bit pitch class mask down by `shift` semitones."""
+    shift %= 12
+    return ((pitch_classes >> shift) | (pitch_classes << (12 - shift))) & PITCH_CLASS_MASK
+
+
+def _build_templates():
+    """Map each bass-relative pitch class mask to (quality, root offset above bass, inversion)."""
+    templates = {}
+    for quality, intervals in CHORD_QUALITIES.items():
+        root_mask = 0
+        for interval in intervals:
+            root_mask |= 1 << interval
+        for inversion, bass_interval in enumerate(intervals):
+            key = _rotate(root_mask, bass_interval)
+            # Symmetric chords (aug, dim7) keep their first, simplest reading
+            templates.setdefault(key, (quality, (12 - bass_interval) % 12, inversion))
+    return templates
+
+
+_TEMPLATES = _build_templates()
+
+
+def note_mask(notes):
+    """128-bit mask of MIDI notes."""
+    mask = 0
+    for note in notes:
+        mask |= 1 << note
+    return mask
+
+
+def pitch_classes(mask):
+    """Fold a 128-bit note mask into a 12-bit pitch class mask."""
+    folded = 0
+    while mask:
+        folded |= mask & PITCH_CLASS_MASK
+        mask >>= 12
+    return folded
+
+
+class ChordMatch(namedtuple('ChordMatch', 'root quality inversion')):
+    """Recognized chord, `root` being a pitch class from 0 (C) to 11 (B)."""
+    __slots__ = ()
+
+    def name(self):
+        return f"{ENGLISH_NAMES[self.root]} {self.quality} ({INVERSION_NAMES[self.inversion]})"
+
+
+def identify_chord(mask):
+    """ChordMatch for the keys in `mask`, None if they do not form a known chord."""
+    if not mask:
+        return None
+    bass = (mask & -mask).bit_length() - 1
+    entry = _TEMPLATES.get(_rotate(pitch_classes(mask), bass))
+    if entry is None:
+        return None
+    quality, root_offset, inversion = entry
+    return ChordMatch((bass + root_offset) % 12, quality, inversion)
+
+
+def identify_interval(mask):
+    """Interval name when exactly two keys are held (compound intervals reduced), else None."""
+    if mask.bit_count() != 2:
+        return None
+    low = (mask & -mask).bit_length() - 1
+    high = mask.bit_length() - 1
+    distance = high - low
+    return INTERVAL_NAMES[12 if distance and distance % 12 == 0 else distance % 12]
+
+
+class ChordTarget(namedtuple('ChordTarget', 'root quality inversion')):
+    """Chord prompt, `root` being the MIDI note of the root in root position."""
+    __slots__ = ()
+
+    def notes(self):
+        """MIDI notes to play, lower chord tones raised an octave for inversions."""
+        intervals = CHORD_QUALITIES[self.quality]
+        notes = [self.root + interval for interval in intervals]
+        for i in range(self.inversion):
+            notes[i] += 12
+        return tuple(sorted(notes))
+
+    def matches(self, mask):
+        """True if the keys in `mask` form this chord and inversion, in any octave."""
+        return identify_chord(mask) == (self.root % 12, self.quality, self.inversion)
+
+    def name(self):
+        return ChordMatch(self.root % 12, self.quality, self.inversion).name()
+
+
+def chord_targets(roots, qualities=TRIADS, inversions=(0,)):
+    """Every ChordTarget for the given root notes, qualities and inversions."""
+    targets = []
+    for root in roots:
+        for quality in qualities:
+            for inversion in inversions:
+                if inversion < len(CHORD_QUALITIES[quality]):
+                    targets.append(ChordTarget(root, quality, inversion))
+    return targets
+
+
+class ChordTracker:
+    """Follows held keys and groups presses into chords.
+
+    Keys pressed within `window_ms` of the first key of a gesture belong to the
+    same chord, so slightly rolled chords are recognized as one. A press after
+    the window starts a new gesture from the keys still held, so a chord
+    rolled more slowly is recognized once its last key goes down. Keys held
+    when `new_gesture` is called stay out of later gestures until pressed again.
+    """
+
+    def __init__(self, window_ms=80):
+        self.window_ms = window_ms
+        self.held = 0      # Keys currently down
+        self.gesture = 0   # Keys of the chord being played, still held
+        self.gesture_start = None
+        self._excluded = 0  # Held keys left out of gestures since `new_gesture`
+
+    def note_on(self, note, timestamp):
+        """Register a key press, returns the ChordMatch of the current gesture or None."""
+        bit = 1 << note
+        self._excluded &= ~bit
+        if self.gesture_start is None or timestamp - self.gesture_start > self.window_ms:
+            self.gesture = self.held & ~self._excluded
+            self.gesture_start = timestamp
+        self.held |= bit
+        self.gesture |= bit
+        return identify_chord(self.gesture)
+
+    def new_gesture(self):
+        """Start a new chord with the next key press, e.g. after a new prompt."""
+        self.gesture = 0
+        self.gesture_start = None
+        self._excluded = self.held
+
+    def note_off(self, note):
+        """Register a key release."""
+        bit = ~(1 << note)
+        self.held &= bit
+        self.gesture &= bit
+        self._excluded &= bit
@@ -1,47 +1,195 @@
 # piano/core/logger.py
-import logging.config
+"""Logging setup for the piano application.
+
+Loggers only put records on a queue; a background listener thread formats
+them and writes them to the rotating log file and the console in batches, so
+logging never does I/O on the render or MIDI thread.
+
+Nothing is configured at import time. Applications call `configure_logging()`
+at startup to route the root logger through the pipeline. Otherwise the
+pipeline is set up with the defaults, `LOG/` included, when the first record
+of a `piano` logger is logged, and only for the `piano` logger: its records
+stop propagating to the root logger, which is left untouched.
+"""
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
+import threading
 
-# Configure logging once when module is imported
 _logpath = 'LOG'
 _log_filename = 'piano.log'
 
-os.makedirs(_logpath, exist_ok=True)
-
-logging.config.dictConfig({
-    'version': 1,
-    'disable_existing_loggers': False,
-    'formatters': {
-        'precise_formatter': {
-            'format': '{asctime} | {levelname} | {name} | {filename}:{lineno} | {message}',
-            'style': '{',
-        },
-        'simple_console_formatter': {
-            'format': '{levelname}|{filename}:{lineno}|{message}',
-            'style': '{',
-        },
-    },
-    'handlers': {
-        'rotating_file_handler': {
-            'class': 'logging.handlers.TimedRotatingFileHandler',
-            'formatter': 'precise_formatter',
-            'filename': os.path.join(_logpath, _log_filename),
-            'when': 'M',  # Note: 'M' for minute, not 'm'
-            'interval': 1,
-            'backupCount': 5,
-            'level': 'DEBUG',
-        },
-        'console_handler': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'simple_console_formatter',
-            'level': 'INFO',
-        },
-    },
-    'root': {
-        'handlers': ['rotating_file_handler', 'console_handler'],
-        'level': 'DEBUG',
-    },
-})
-
-# Export convenience function
-get_logger = logging.getLogger
+PRECISE_FORMAT = '{asctime} | {levelname} | {name} | {filename}:{lineno} | {message}'
+CONSOLE_FORMAT = '{levelname}|{filename}:{lineno}|{message}'
+
+_listener = None
+_queue_handler = None
+_bootstrap_handler = None
+_logger = None  # Logger holding the queue handler
+
+
+class BatchFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """Rotating file handler flushed once per batch instead of once per record."""
+
+    batching = True
+
+    def flush(self):
+        if not self.batching:
+            super().flush()
+
+    def flush_batch(self):
+        super().flush()
+
+
+class BatchingQueueListener:
+    """Drains the log queue on a background thread.
+
+    Every wakeup handles all waiting records (up to `batch_size`) before
+    flushing the handlers once.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_queue, handlers, batch_size=256):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for record in batch:
+                if record is self._STOP:
+                    stop = True
+                    continue
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+            self.flush()
+            if stop:
+                return
+
+    def flush(self):
+        for handler in self.handlers:
+            getattr(handler, 'flush_batch', handler.flush)()
+
+    def stop(self):
+        """Write every queued record, then stop the thread."""
+        if self._thread is not None:
+            self.queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+
+def configure_logging(log_dir=_logpath, filename=_log_filename, when='M', interval=1,
+                      backup_count=5, file_level=logging.DEBUG, console_level=logging.INFO):
+    """Route the root logger through the queue to a rotating file and the console.
+
+    `when`, `interval` and `backup_count` are passed to TimedRotatingFileHandler
+    ('M' rotates every `interval` minutes, 'H' hours, 'midnight' daily). If
+    the pipeline was already set up lazily for the `piano` logger, it is moved
+    to the root logger as is.
+    """
+    _start(logging.getLogger(), log_dir, filename, when, interval, backup_count, file_level, console_level)
+
+
+def _start(logger, log_dir=_logpath, filename=_log_filename, when='M', interval=1,
+           backup_count=5, file_level=logging.DEBUG, console_level=logging.INFO):
+    """Set up the pipeline if needed and attach its queue handler to `logger`."""
+    global _listener, _queue_handler
+    _remove_bootstrap()
+    if _listener is None:
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = BatchFileHandler(os.path.join(log_dir, filename), when=when,
+                                        interval=interval, backupCount=backup_count)
+        file_handler.setFormatter(logging.Formatter(PRECISE_FORMAT, style='{'))
+        file_handler.setLevel(file_level)
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT, style='{'))
+        console_handler.setLevel(console_level)
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _listener = BatchingQueueListener(log_queue, [file_handler, console_handler])
+        _listener.start()
+        atexit.register(shutdown_logging)
+    _attach(_queue_handler, logger)
+
+
+def _attach(handler, logger):
+    """Move `handler` from the logger holding it to `logger`."""
+    global _logger
+    package = logging.getLogger('piano')
+    if _logger is not None:
+        _logger.removeHandler(handler)
+        if _logger is package:
+            package.propagate = True
+    if logger is package:
+        # Piano's own file and console, the host's handlers never see these records
+        package.propagate = False
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    _logger = logger
+
+
+def shutdown_logging():
+    """Flush every pending record to disk and stop the listener thread.
+
+    Records logged afterwards are written directly by the handlers.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _logger.removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.batching = False  # Back to flushing every record
+        handler.flush()
+        _logger.addHandler(handler)
+    _listener = _queue_handler = None
+
+
+class _BootstrapHandler(logging.Handler):
+    """Sets up the pipeline for the `piano` logger when its first record arrives, then forwards it."""
+
+    def handle(self, record):
+        _start(logging.getLogger('piano'))
+        # Handlers added while the record is being handled do not see it
+        _queue_handler.handle(record)
+        return True
+
+    def emit(self, record):
+        pass
+
+
+def _remove_bootstrap():
+    global _bootstrap_handler
+    if _bootstrap_handler is not None:
+        logging.getLogger('piano').removeHandler(_bootstrap_handler)
+        _bootstrap_handler = None
+_logger = None  # Logger holding the queue handler
+
+
+def get_logger(name=None):
+    """Return a logger, logging is configured lazily on the first record of a `piano` logger."""
+    global _bootstrap_handler
+    if _listener is None and _bootstrap_handler is None:
+        _bootstrap_handler = _BootstrapHandler()
+        package = logging.getLogger('piano')
+        package.addHandler(_bootstrap_handler)
+        if package.level == logging.NOTSET:
+            package.setLevel(logging.DEBUG)  # The handlers filter by level, not the root logger
+    return logging.getLogger(name)
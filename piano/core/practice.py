@@ -0,0 +1,411 @@
+"""Practice session logic, independent from the UI."""
+
+import random
+from array import array
+from enum import IntEnum
+
+from piano.core.chords import chord_targets
+from piano.midi.notes import WHITE_KEY_INDICES
+
+NO_NOTE = 255  # Played note of an attempt still waiting for an answer
+MAX_LATENCY_MS = 0xFFFF  # Reaction times are stored on 16 bits
+DEFAULT_NOTE = 60  # Middle C, prompted when no note is selectable
+
+
+class AttemptStatus(IntEnum):
+    """Outcome of one prompt."""
+    PENDING = 0
+    SUCCESS = 1
+    ERROR = 2
+
+
+class PracticeHistory:
+    """Fixed-capacity ring of practice attempts.
+
+    Each row is a prompt (target note, played note, status, prompt timestamp
+    and reaction time in ms) kept in compact arrays, so memory stays the same
+    however long the session runs. The prompt text is kept as it was shown,
+    so changing the naming options does not rewrite earlier rows; the answer
+    text is only built for the rows actually displayed.
+    """
+
+    def __init__(self, capacity=64):
+        """Keep the last `capacity` attempts."""
+        self.capacity = capacity
+        self.target = array('B', bytes(capacity))
+        self.played = array('B', bytes(capacity))
+        self.status = array('B', bytes(capacity))
+        self.timestamp = array('L', [0]) * capacity
+        self.latency = array('H', [0]) * capacity
+        self.requests = [None] * capacity  # Prompt text of each row
+        self.total = 0  # Attempts added since the session started
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def add_prompt(self, target, timestamp, request=None):
+        """Start a new attempt asking for `target`, `request` being the prompt text shown."""
+        slot = self.total % self.capacity
+        self.target[slot] = target
+        self.requests[slot] = request
+        self.played[slot] = NO_NOTE
+        self.status[slot] = AttemptStatus.PENDING
+        self.timestamp[slot] = timestamp
+        self.latency[slot] = 0
+        self.total += 1
+
+    def resolve(self, played, status, timestamp=None):
+        """Record the answer to the latest attempt, played at `timestamp` on the prompt's clock."""
+        slot = (self.total - 1) % self.capacity
+        self.played[slot] = played
+        self.status[slot] = status
+        if timestamp is not None:
+            self.latency[slot] = min(max(timestamp - self.timestamp[slot], 0), MAX_LATENCY_MS)
+
+    def last(self, count):
+        """Yield (target, played, status, timestamp, latency) for the last `count` attempts, oldest first."""
+        for i in range(self.total - min(count, len(self)), self.total):
+            slot = i % self.capacity
+            yield (self.target[slot], self.played[slot], AttemptStatus(self.status[slot]),
+                   self.timestamp[slot], self.latency[slot])
+
+    def lines(self, count, format_request, format_note):
+        """Return (text, status) for the last `count` attempts.
+
+        `format_request(target)` builds the prompt text of rows added without
+        one and `format_note(note)` the played note name.
+        """
+        rows = []
+        for i in range(self.total - min(count, len(self)), self.total):
+            slot = i % self.capacity
+            played, status = self.played[slot], self.status[slot]
+            text = self.requests[slot]
+            if text is None:
+                text = format_request(self.target[slot])
+            if status == AttemptStatus.SUCCESS:
+                text = f"{text} | You played: {format_note(played)}"
+            elif status == AttemptStatus.ERROR:
+                text = f"{text} | You played: {format_note(played)} (error)"
+            rows.append((text, AttemptStatus(status)))
+        return rows
+
+
+class ReactionStats:
+    """Median and 95th percentile of the most recent reaction times.
+
+    Samples are kept in a fixed window of 16 bit milliseconds. Percentiles
+    are computed from a sorted copy made at most once per new sample.
+    """
+
+    def __init__(self, window=256):
+        """Keep the last `window` reaction times."""
+        self.window = window
+        self.samples = array('H', [0]) * window
+        self.total = 0
+        self._sorted = None
+
+    def __len__(self):
+        return min(self.total, self.window)
+
+    def add(self, latency_ms):
+        """Record one reaction time in milliseconds."""
+        self.samples[self.total % self.window] = min(max(int(latency_ms), 0), MAX_LATENCY_MS)
+        self.total += 1
+        self._sorted = None
+
+    def percentile(self, percent):
+        """Nearest-rank percentile in ms, None when no sample was recorded."""
+        count = len(self)
+        if not count:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self.samples[:count])
+        rank = max(1, -(-percent * count // 100))  # Ceiling of percent * count / 100
+        return self._sorted[int(rank) - 1]
+
+    def median(self):
+        return self.percentile(50)
+
+    def p95(self):
+        return self.percentile(95)
+
+
+def octave_notes(octave, white_keys_only):
+    """MIDI notes of one octave, C4 being the first note of octave 4."""
+    base = (octave + 1) * 12
+    if white_keys_only:
+        return tuple(base + i for i in WHITE_KEY_INDICES)
+    return tuple(range(base, base + 12))
+
+
+class NotePool:
+    """Candidate notes for the next prompt.
+
+    The pool follows the header checkboxes incrementally: toggling an octave
+    or the white-keys flag only adds or removes the notes concerned. With
+    `chord_qualities`, the chords of those qualities built on each note, in
+    each of `chord_inversions`, are candidates too. Each note
+    carries a weight clamped to [min_weight, max_weight], and sampling uses
+    rejection against max_weight, so picking a note is O(1) on average
+    whatever the pool size.
+    """
+
+    def __init__(self, octaves, white_keys_only=True, min_weight=0.25, max_weight=4.0, rng=None,
+                 chord_qualities=(), chord_inversions=(0,)):
+        """Build the pool for the selected `octaves`."""
+        self.octaves = set()
+        self.white_keys_only = white_keys_only
+        self.chord_qualities = tuple(chord_qualities)
+        self.chord_inversions = tuple(chord_inversions)
+        self.min_weight = min_weight
+        self.max_weight = max_weight
+        self.rng = rng or random.Random()
+        self.notes = []        # Candidates, in no particular order
+        self._position = {}    # Note -> index in self.notes
+        self.weights = {}      # Note -> weight, kept when the note leaves the pool
+        self._candidates = {}  # (octave mask, white keys flag) -> sorted candidate tuple
+        for octave in octaves:
+            self.set_octave(octave, True)
+
+    def __len__(self):
+        return len(self.notes)
+
+    def __contains__(self, note):
+        return note in self._position
+
+    def key(self):
+        """Cache key of the current selection."""
+        mask = 0
+        for octave in self.octaves:
+            mask |= 1 << octave
+        return mask, self.white_keys_only, self.chord_qualities, self.chord_inversions
+
+    def candidates(self):
+        """Sorted candidates of the current selection, notes before chords, cached per selection."""
+        key = self.key()
+        notes = self._candidates.get(key)
+        if notes is None:
+            # Notes and chords do not compare with each other, sort each kind on its own
+            notes = self._candidates[key] = tuple(sorted(self.notes, key=lambda t: (isinstance(t, tuple), t)))
+        return notes
+
+    def _targets(self, roots):
+        """Candidates built on `roots`: the notes themselves and their chords."""
+        for root in roots:
+            yield root
+            yield from chord_targets((root,), self.chord_qualities, self.chord_inversions)
+
+    def add(self, note):
+        """Add a candidate, a MIDI note or any hashable target such as a ChordTarget."""
+        if note not in self._position:
+            self._position[note] = len(self.notes)
+            self.notes.append(note)
+
+    def remove(self, note):
+        """Remove a candidate if present."""
+        index = self._position.pop(note, None)
+        if index is None:
+            return
+        last = self.notes.pop()
+        if last != note:
+            # Move the last note into the freed slot
+            self.notes[index] = last
+            self._position[last] = index
+
+    def set_octave(self, octave, selected):
+        """Add or remove the notes of one octave."""
+        if selected == (octave in self.octaves):
+            return
+        update = self.add if selected else self.remove
+        for target in self._targets(octave_notes(octave, self.white_keys_only)):
+            update(target)
+        if selected:
+            self.octaves.add(octave)
+        else:
+            self.octaves.discard(octave)
+
+    def set_white_keys_only(self, white_keys_only):
+        """Add or remove the black keys of the selected octaves."""
+        if white_keys_only == self.white_keys_only:
+            return
+        self.white_keys_only = white_keys_only
+        update = self.remove if white_keys_only else self.add
+        for octave in self.octaves:
+            base = (octave + 1) * 12
+            for target in self._targets(base + i for i in range(12) if i not in WHITE_KEY_INDICES):
+                update(target)
+
+    def set_chords(self, qualities, inversions=(0,)):
+        """Replace the chords prompted along with the notes, e.g. (TRIADS, (0, 1, 2))."""
+        roots = [root for octave in self.octaves for root in octave_notes(octave, self.white_keys_only)]
+        old = set(chord_targets(roots, self.chord_qualities, self.chord_inversions))
+        self.chord_qualities = tuple(qualities)
+        self.chord_inversions = tuple(inversions)
+        new = set(chord_targets(roots, self.chord_qualities, self.chord_inversions))
+        for target in old - new:
+            self.remove(target)
+        for target in new - old:
+            self.add(target)
+
+    def set_weight(self, note, weight):
+        """Bias how often `note` is picked, 1.0 being the neutral weight."""
+        self.weights[note] = min(max(weight, self.min_weight), self.max_weight)
+
+    def sample(self):
+        """Pick a note with probability proportional to its weight."""
+        if not self.notes:
+            return DEFAULT_NOTE
+        notes, weights, rng = self.notes, self.weights, self.rng
+        while True:
+            note = notes[int(rng.random() * len(notes))]
+            if rng.random() * self.max_weight < weights.get(note, 1.0):
+                return note
+
+
+class NoteStats:
+    """Running statistics of one practice target."""
+    __slots__ = ('attempts', 'errors', 'error_rate', 'response_ms', 'box')
+
+    def __init__(self):
+        self.attempts = 0
+        self.errors = 0
+        self.error_rate = 0.0   # Exponential moving average of errors
+        self.response_ms = 0.0  # Exponential moving average of correct answer times
+        self.box = 0            # Leitner box, higher means better known
+
+
+class AdaptiveSelector:
+    """Spaced-repetition selection of practice targets.
+
+    Every target climbs one Leitner box when answered correctly and quickly,
+    and falls back to the first box on an error. Its weight in the NotePool
+    comes from its box and recent error rate, and only the answered target is
+    updated, so recording an answer and picking the next prompt both cost the
+    same for 7 notes or all 88 keys. Targets can be single notes or any
+    hashable multi-note target such as a chord tuple.
+    """
+
+    # Weights are multiplied by 1 + error rate (below 2). A target never asked keeps
+    # the neutral 1.0, so box 0 (last answer wrong) stays in (2.0, 4.0) above it,
+    # without reaching max_weight, and the learned boxes stay below it.
+    BOX_WEIGHTS = (2.0, 0.5, 0.4, 0.3, 0.25)
+
+    def __init__(self, pool, alpha=0.3, slow_factor=1.5):
+        """Drive the weights of `pool`, `alpha` being the smoothing of the moving averages."""
+        self.pool = pool
+        self.alpha = alpha
+        self.slow_factor = slow_factor
+        self.stats = {}
+        self.mean_response_ms = 0.0  # Moving average over every target
+
+    def next(self):
+        """Pick the next target to prompt."""
+        return self.pool.sample()
+
+    def record(self, target, correct, response_ms=None):
+        """Update the statistics of `target` after an answer."""
+        stats = self.stats.get(target)
+        if stats is None:
+            stats = self.stats[target] = NoteStats()
+        alpha = self.alpha
+        stats.attempts += 1
+        stats.error_rate += alpha * ((0.0 if correct else 1.0) - stats.error_rate)
+
+        if not correct:
+            stats.errors += 1
+            stats.box = 0
+        elif response_ms is None:
+            stats.box = min(stats.box + 1, len(self.BOX_WEIGHTS) - 1)
+        else:
+            slow = self.mean_response_ms and response_ms > self.slow_factor * self.mean_response_ms
+            if not slow:
+                stats.box = min(stats.box + 1, len(self.BOX_WEIGHTS) - 1)
+            if not stats.response_ms:
+                stats.response_ms = response_ms
+            stats.response_ms += alpha * (response_ms - stats.response_ms)
+            if not self.mean_response_ms:
+                self.mean_response_ms = response_ms
+            self.mean_response_ms += alpha * (response_ms - self.mean_response_ms)
+
+        self.pool.set_weight(target, self.BOX_WEIGHTS[stats.box] * (1.0 + stats.error_rate))
+
+
+class ScoreFollower:
+    """Follows a player through a reference melody.
+
+    The incoming notes are aligned to the reference with an online edit
+    distance (extra notes, skipped notes and wrong notes each have a cost)
+    restricted to a band of `window` reference notes around the current
+    position. The band slides forward with the player, so each note costs
+    O(window) whatever the length of the piece.
+
+    Ties go to the lowest position: with the default costs, a wrong note
+    played in place of the expected one, or the note right after a skipped
+    one, is first counted as an extra note (unmatched, position unchanged);
+    the alignment catches up on the next note that matches. For example
+    [60, 64, 65] against [60, 62, 64, 65] matches 60 and 65 only.
+    """
+
+    def __init__(self, reference, window=16, extra_cost=1.0, skip_cost=1.0, wrong_cost=1.0):
+        """Follow `reference`, a sequence of MIDI notes."""
+        self.reference = array('B', reference)
+        self.window = window
+        self.extra_cost = extra_cost
+        self.skip_cost = skip_cost
+        self.wrong_cost = wrong_cost
+        self.base = 0  # Reference index of the band start
+        # cost[k]: best alignment cost having consumed base + k reference notes
+        self.cost = [k * skip_cost if k <= len(self.reference) else float('inf') for k in range(window + 1)]
+        self.position = 0  # Reference notes consumed, i.e. index of the next expected note
+        self.played = 0
+        self.matched = 0
+
+    def follow(self, note):
+        """Align one played note, returns (position, matched)."""
+        reference, base, previous = self.reference, self.base, self.cost
+        cost = [previous[0] + self.extra_cost]
+        for k in range(1, self.window + 1):
+            index = base + k - 1
+            if index >= len(reference):
+                cost.append(float('inf'))
+                continue
+            substitution = 0.0 if reference[index] == note else self.wrong_cost
+            cost.append(min(previous[k] + self.extra_cost,   # Extra note, reference not advanced
+                            cost[k - 1] + self.skip_cost,    # Reference note skipped
+                            previous[k - 1] + substitution))  # Played in place of reference note
+        best = min(range(len(cost)), key=cost.__getitem__)
+        matched = best > 0 and reference[base + best - 1] == note and cost[best] == previous[best - 1]
+
+        self.played += 1
+        self.matched += matched
+        self.position = base + best
+
+        # Keep costs small and the band ahead of the player
+        lowest = cost[best]
+        cost = [c - lowest for c in cost]
+        shift = best - self.window // 4
+        if shift > 0:
+            self.base += shift
+            cost = cost[shift:]
+            for k in range(len(cost), self.window + 1):
+                within = self.base + k <= len(reference)
+                cost.append(cost[-1] + self.skip_cost if within else float('inf'))
+        self.cost = cost
+        return self.position, matched
+
+    def expected(self):
+        """Next reference note, None once the piece is finished."""
+        if self.position < len(self.reference):
+            return self.reference[self.position]
+        return None
+
+    def finished(self):
+        return self.position >= len(self.reference)
+
+    def progress(self):
+        """Fraction of the piece played."""
+        return self.position / len(self.reference) if self.reference else 1.0
+
+    def accuracy(self):
+        """Fraction of played notes that matched the reference."""
+        return self.matched / self.played if self.played else 1.0
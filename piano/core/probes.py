@@ -0,0 +1,99 @@
+"""Lightweight timing probes for the main loops.
+
+Each probe feeds a rolling histogram over the last `window` samples. Bins are
+fixed and log-spaced, and counts, the ring of recent bins and the ring of
+recent durations are preallocated arrays: recording a sample only updates a
+few slots, nothing grows, so the probes can stay on in production.
+"""
+
+import time
+from array import array
+from bisect import bisect_right
+
+# Bin upper edges in ms, log-spaced from 0.05 ms to about 1.6 s
+BIN_EDGES_MS = array('d', [0.05 * 2 ** (i / 2) for i in range(31)])
+
+
+class RollingHistogram:
+    """Histogram of the last `window` durations, in ms."""
+
+    def __init__(self, window=600, edges=BIN_EDGES_MS):
+        self.window = window
+        self.edges = edges
+        self.counts = array('L', [0]) * (len(edges) + 1)  # Last bin: above the last edge
+        self._bins = array('B', bytes(window))
+        self._values = array('d', [0.0]) * window
+        self._total = 0.0
+        self.samples = 0  # Samples recorded since the start
+
+    def add(self, ms):
+        slot = self.samples % self.window
+        if self.samples >= self.window:
+            self.counts[self._bins[slot]] -= 1
+            self._total -= self._values[slot]
+        index = bisect_right(self.edges, ms)
+        self.counts[index] += 1
+        self._bins[slot] = index
+        self._values[slot] = ms
+        self._total += ms
+        self.samples += 1
+
+    def __len__(self):
+        return min(self.samples, self.window)
+
+    def mean(self):
+        return self._total / len(self) if self.samples else 0.0
+
+    def percentile(self, percent):
+        """Upper edge of the bin holding the `percent` percentile, 0.0 without samples.
+
+        Durations above the last edge are reported as the last edge.
+        """
+        rank = len(self) * percent / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return self.edges[min(index, len(self.edges) - 1)]
+        return 0.0
+
+    def last(self):
+        return self._values[(self.samples - 1) % self.window] if self.samples else 0.0
+
+
+class _Section:
+    """Reusable context manager timing one section into its histogram."""
+
+    __slots__ = ('histogram', '_start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.add((time.perf_counter() - self._start) * 1000)
+
+
+class TimingProbes:
+    """Named probes, e.g. `with probes.section("draw"): ...`.
+
+    Sections are created once per name, timing a section allocates nothing.
+    `add` records a duration measured elsewhere.
+    """
+
+    def __init__(self, names, window=600):
+        self.histograms = {name: RollingHistogram(window) for name in names}
+        self._sections = {name: _Section(histogram) for name, histogram in self.histograms.items()}
+
+    def section(self, name):
+        return self._sections[name]
+
+    def add(self, name, ms):
+        self.histograms[name].add(ms)
+
+    def __getitem__(self, name):
+        return self.histograms[name]
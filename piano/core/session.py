@@ -0,0 +1,163 @@
+"""Practice session recording.
+
+A session file is a small header followed by fixed-size records, one per raw
+MIDI event or prompt, appended as the session goes. Fixed-size records make
+the file seekable by index, so the reader memory-maps it and reads any
+record directly, without parsing the whole file.
+"""
+
+import mmap
+import os
+import struct
+import time
+
+from piano.core.chords import CHORD_QUALITIES, ChordTarget
+from piano.midi.smf import write_smf
+
+MAGIC = b'PPSN'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHxxd')  # Magic, version, session start (epoch seconds)
+RECORD = struct.Struct('<IBBBB')   # Timestamp (ms), kind, three data bytes
+
+KIND_MIDI = 0    # Data bytes are status, data1, data2
+KIND_PROMPT = 1  # Target note, for a chord its root, 1 + quality index and inversion
+
+_QUALITIES = tuple(CHORD_QUALITIES)
+
+
+class SessionRecorder:
+    """Appends MIDI events and prompts to a session file.
+
+    A record is never stamped earlier than the one before it: prompts are
+    stamped when shown, after their batch was recorded, while the next batch
+    may hold events captured meanwhile. Those events are moved to the prompt
+    time, at most a few ms, so timestamps never decrease in the file.
+    """
+
+    def __init__(self, path):
+        """Start a new session file at `path`, replacing any existing file."""
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, time.time()))
+        self.count = 0
+        self._last_time = 0
+
+    def record_events(self, events):
+        """Append a batch of pygame.midi events ([[status, d1, d2, d3], timestamp])."""
+        pack, last = RECORD.pack, self._last_time
+        records = []
+        for (status, data1, data2, _), timestamp in events:
+            last = max(last, timestamp)
+            records.append(pack(last, KIND_MIDI, status, data1, data2))
+        self._file.write(b''.join(records))
+        self._last_time = last
+        self.count += len(events)
+
+    def record_prompt(self, target, timestamp):
+        """Append a prompt asking for `target`, a MIDI note or a ChordTarget."""
+        timestamp = self._last_time = max(self._last_time, timestamp)
+        if isinstance(target, ChordTarget):
+            record = RECORD.pack(timestamp, KIND_PROMPT, target.root,
+                                 1 + _QUALITIES.index(target.quality), target.inversion)
+        else:
+            record = RECORD.pack(timestamp, KIND_PROMPT, target, 0, 0)
+        self._file.write(record)
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _check_header(path):
+    with open(path, 'rb') as f:
+        magic, version, start = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} piano session file")
+    return start
+
+
+class SessionReader:
+    """Memory-mapped view of a session file.
+
+    Records are (timestamp, kind, a, b, c) tuples read on demand, timestamps
+    never decrease (see SessionRecorder) so `seek_time` is a binary search.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.start_time = _check_header(path)
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # A partially written last record (e.g. after a crash) is ignored
+        self._count = (len(self._map) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("session record index out of range")
+        return RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+
+    def timestamp(self, index):
+        return struct.unpack_from('<I', self._map, HEADER.size + index * RECORD.size)[0]
+
+    def seek_time(self, ms):
+        """Index of the first record at or after `ms`."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) < ms:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def records(self, start=0, stop=None):
+        """Yield records from index `start` to `stop`."""
+        stop = self._count if stop is None else min(stop, self._count)
+        for offset in range(HEADER.size + start * RECORD.size, HEADER.size + stop * RECORD.size, RECORD.size):
+            yield RECORD.unpack_from(self._map, offset)
+
+    def iter_midi_events(self, start_ms=0):
+        """Yield MIDI events from `start_ms` on, in pygame.midi format."""
+        for timestamp, kind, a, b, c in self.records(self.seek_time(start_ms)):
+            if kind == KIND_MIDI:
+                yield [[a, b, c, 0], timestamp]
+
+    def midi_events(self, start_ms=0):
+        """MIDI events from `start_ms` on as a list, ready for a ReplaySource."""
+        return list(self.iter_midi_events(start_ms))
+
+    def export_smf(self, path):
+        """Save the session's MIDI events as a Standard MIDI File."""
+        name = os.path.splitext(os.path.basename(self.path))[0]
+        write_smf(path, self.iter_midi_events(), track_name=name)
+
+    def prompts(self, start_ms=0):
+        """Yield (timestamp, target) for each prompt from `start_ms` on, target being a note or a ChordTarget."""
+        for timestamp, kind, target, quality, inversion in self.records(self.seek_time(start_ms)):
+            if kind == KIND_PROMPT:
+                yield timestamp, ChordTarget(target, _QUALITIES[quality - 1], inversion) if quality else target
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,412 @@
+"""MIDI input service for the piano practice application.
+
+The device is drained on a dedicated capture thread into a preallocated ring
+buffer, so the render loop only picks up ready batches and never waits on
+PortMidi itself. Batches can be decoded into typed messages with MidiDecoder.
+
+Events come from a source: the PortMidi device by default, or a ReplaySource /
+SyntheticSource to run the application without a keyboard.
+"""
+
+import random
+import threading
+import time
+from array import array
+
+import pygame.midi
+
+from piano.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+SUSTAIN_PEDAL = 64  # Control change number of the sustain (damper) pedal
+
+
+class NoteOn:
+    """Key pressed."""
+    __slots__ = ('channel', 'note', 'velocity', 'timestamp')
+
+    def __init__(self, channel, note, velocity, timestamp):
+        self.channel = channel
+        self.note = note
+        self.velocity = velocity
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"NoteOn(channel={self.channel}, note={self.note}, velocity={self.velocity}, timestamp={self.timestamp})"
+
+
+class NoteOff:
+    """Key released, also produced by a note-on with velocity 0."""
+    __slots__ = ('channel', 'note', 'velocity', 'timestamp')
+
+    def __init__(self, channel, note, velocity, timestamp):
+        self.channel = channel
+        self.note = note
+        self.velocity = velocity
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"NoteOff(channel={self.channel}, note={self.note}, velocity={self.velocity}, timestamp={self.timestamp})"
+
+
+class ControlChange:
+    """Controller moved, e.g. the sustain pedal."""
+    __slots__ = ('channel', 'control', 'value', 'timestamp')
+
+    def __init__(self, channel, control, value, timestamp):
+        self.channel = channel
+        self.control = control
+        self.value = value
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"ControlChange(channel={self.channel}, control={self.control}, value={self.value}, timestamp={self.timestamp})"
+
+
+class PitchBend:
+    """Pitch wheel moved, `value` ranges from -8192 to 8191."""
+    __slots__ = ('channel', 'value', 'timestamp')
+
+    def __init__(self, channel, lsb, msb, timestamp):
+        self.channel = channel
+        self.value = ((msb << 7) | lsb) - 8192
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"PitchBend(channel={self.channel}, value={self.value}, timestamp={self.timestamp})"
+
+
+def _note_on(channel, note, velocity, timestamp):
+    if velocity:
+        return NoteOn(channel, note, velocity, timestamp)
+    return NoteOff(channel, note, 0, timestamp)
+
+
+def _build_status_table():
+    """Map each of the 256 status bytes to (message factory, channel), None when ignored."""
+    table = [None] * 256
+    for channel in range(16):
+        table[0x80 | channel] = (NoteOff, channel + 1)
+        table[0x90 | channel] = (_note_on, channel + 1)
+        table[0xB0 | channel] = (ControlChange, channel + 1)
+        table[0xE0 | channel] = (PitchBend, channel + 1)
+    return table
+
+
+_STATUS_TABLE = _build_status_table()
+_MESSAGE_TYPES = (NoteOn, NoteOff, ControlChange, PitchBend)
+
+
+class MidiDecoder:
+    """Turns pygame.midi event batches into typed messages.
+
+    Status bytes are classified through a precomputed 256-entry table that
+    covers all 16 channels, so the message type and channel come from one
+    lookup instead of masking and comparing the status of each event. The
+    only comparisons left sort out data bytes and system messages for
+    running status. Messages of other types (clock, active sensing, aftertouch)
+    are dropped, as well as the types not listed in `kinds`, so the consumer
+    only ever sees what it asked for. Running status is supported: a batch
+    entry starting with a data byte reuses the previous status, until a
+    system common message (0xF0-0xF7) cancels it.
+    """
+
+    def __init__(self, kinds=_MESSAGE_TYPES):
+        """Keep only messages whose type is in `kinds`."""
+        self.kinds = frozenset(kinds)
+        self.running_status = 0
+        # Factories of unwanted types are removed from the table up front, except note-on
+        # whose velocity 0 form is a note-off
+        keep = set(self.kinds)
+        if NoteOn in keep or NoteOff in keep:
+            keep.add(_note_on)
+        self._table = [entry if entry and entry[0] in keep else None for entry in _STATUS_TABLE]
+
+    def decode(self, events):
+        """Decode a batch of [[status, data1, data2, data3], timestamp] events."""
+        table, kinds = self._table, self.kinds
+        running = self.running_status
+        messages = []
+        for (status, data1, data2, _), timestamp in events:
+            if status < 0x80:
+                status, data1, data2 = running, status, data1
+            elif status < 0xF0:
+                running = status
+            elif status < 0xF8:
+                running = 0  # Real-time messages (0xF8-0xFF) keep it
+            entry = table[status]
+            if entry is not None:
+                message = entry[0](entry[1], data1, data2, timestamp)
+                if type(message) in kinds:
+                    messages.append(message)
+        self.running_status = running
+        return messages
+
+
+class EventRing:
+    """Fixed-size single-producer / single-consumer ring of MIDI events.
+
+    Slots are preallocated once. The producer only moves the write index and
+    the consumer only moves the read index, so no lock is needed between the
+    capture thread and the UI thread.
+    """
+
+    def __init__(self, capacity=4096):
+        """Allocate storage for `capacity` events."""
+        self.capacity = capacity
+        self._status = array('B', bytes(capacity))
+        self._data1 = array('B', bytes(capacity))
+        self._data2 = array('B', bytes(capacity))
+        self._timestamp = array('L', [0]) * capacity
+        self._write = 0  # Total events written, only touched by the producer
+        self._read = 0   # Total events consumed, only touched by the consumer
+
+    def __len__(self):
+        return self._write - self._read
+
+    def free(self):
+        """Number of slots the producer can still fill."""
+        return self.capacity - (self._write - self._read)
+
+    def push(self, status, data1, data2, timestamp):
+        """Store one event, returns False when the ring is full."""
+        if self._write - self._read >= self.capacity:
+            return False
+        slot = self._write % self.capacity
+        self._status[slot] = status
+        self._data1[slot] = data1
+        self._data2[slot] = data2
+        self._timestamp[slot] = timestamp
+        self._write += 1  # Publish only once the slot is fully written
+        return True
+
+    def pop_batch(self, max_events=None):
+        """Return pending events in pygame.midi format: [[status, d1, d2, 0], timestamp]."""
+        start, end = self._read, self._write
+        if max_events is not None:
+            end = min(end, start + max_events)
+        batch = []
+        for i in range(start, end):
+            slot = i % self.capacity
+            batch.append([[self._status[slot], self._data1[slot], self._data2[slot], 0],
+                          self._timestamp[slot]])
+        self._read = end
+        return batch
+
+
+class PortMidiSource:
+    """Physical MIDI input device through pygame.midi."""
+
+    def __init__(self, device_id=None, buffer_size=4096):
+        """Open the device, the default input when `device_id` is None."""
+        if not pygame.midi.get_init():
+            pygame.midi.init()
+        if device_id is None:
+            device_id = pygame.midi.get_default_input_id()
+        if device_id == -1:
+            raise RuntimeError("No MIDI input device found.")
+        self.device_id = device_id
+        info = pygame.midi.get_device_info(device_id)
+        self.name = info[1].decode(errors="replace") if info else f"Device {device_id}"
+        self._device = pygame.midi.Input(device_id, buffer_size)
+
+    def poll(self):
+        return self._device.poll()
+
+    def read(self, max_events):
+        return self._device.read(max_events)
+
+    def time(self):
+        """PortMidi clock in ms, the timebase of event timestamps."""
+        return pygame.midi.time()
+
+    def close(self):
+        self._device.close()
+
+
+class _ClockSource:
+    """Base of the software sources, timestamps are ms since the source was created."""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+
+    def time(self):
+        return int((time.perf_counter() - self._start) * 1000)
+
+    def close(self):
+        pass
+
+
+class ReplaySource(_ClockSource):
+    """Plays back recorded events in real time.
+
+    `events` is a sequence in pygame.midi format ([[status, d1, d2, d3], timestamp]),
+    released when their timestamp, relative to the first one and divided by
+    `speed`, is reached. Timestamps are rewritten to this source's clock so
+    reaction times stay meaningful.
+    """
+
+    def __init__(self, events, speed=1.0, loop=False, name="Replay"):
+        super().__init__()
+        self.name = name
+        self.events = events
+        self.speed = speed
+        self.loop = loop
+        self._next = 0
+        self._offset = 0  # Clock time of the current pass, in ms
+        self._first = events[0][1] if events else 0
+
+    def _due(self, index, now):
+        return (self.events[index][1] - self._first) / self.speed + self._offset <= now
+
+    def poll(self):
+        if self._next >= len(self.events):
+            if not self.loop or not self.events:
+                return False
+            self._next = 0
+            self._offset = self.time()
+        return self._due(self._next, self.time())
+
+    def read(self, max_events):
+        now = self.time()
+        batch = []
+        while self._next < len(self.events) and len(batch) < max_events and self._due(self._next, now):
+            data, timestamp = self.events[self._next]
+            due = int((timestamp - self._first) / self.speed + self._offset)
+            batch.append([list(data), due])
+            self._next += 1
+        return batch
+
+    def finished(self):
+        """True once every event was read and the source does not loop."""
+        return not self.loop and self._next >= len(self.events)
+
+
+class SyntheticSource(_ClockSource):
+    """Generates `rate` random note-on/note-off events per second, for load tests."""
+
+    def __init__(self, rate=10, notes=range(36, 97), velocity=80, channel=1, seed=None, name="Synthetic"):
+        super().__init__()
+        self.name = name
+        self.rate = rate
+        self.notes = list(notes)
+        self.velocity = velocity
+        self.channel = channel
+        self.generated = 0
+        self._rng = random.Random(seed)
+        self._held = None  # Note waiting for its note-off
+
+    def _pending(self):
+        return int((time.perf_counter() - self._start) * self.rate) - self.generated
+
+    def poll(self):
+        return self._pending() > 0
+
+    def read(self, max_events):
+        batch = []
+        for _ in range(min(self._pending(), max_events)):
+            timestamp = int((self.generated / self.rate) * 1000)
+            if self._held is None:
+                self._held = self._rng.choice(self.notes)
+                batch.append([[0x90 | (self.channel - 1), self._held, self.velocity, 0], timestamp])
+            else:
+                batch.append([[0x80 | (self.channel - 1), self._held, 0, 0], timestamp])
+                self._held = None
+            self.generated += 1
+        return batch
+
+
+class MidiInput:
+    """MIDI input source drained on its own thread.
+
+    Usage mirrors pygame.midi.Input: `poll()` tells if events are waiting and
+    `read()` returns them, but every pending event is handed over in one batch
+    instead of at most `n` per call. `notify` is called from the capture thread
+    when events become available, e.g. to wake up an idle UI loop.
+    """
+
+    def __init__(self, source=None, device_id=None, buffer_size=4096, read_size=64,
+                 idle_sleep=0.001, quiet_sleep=0.005, quiet_after=2.0, notify=None):
+        """Read from `source`, by default the MIDI device `device_id` (the default input if None)."""
+        if source is None:
+            source = PortMidiSource(device_id, buffer_size)
+        self.source = source
+        self.device_name = source.name
+        self.read_size = read_size
+        self.idle_sleep = idle_sleep
+        self.quiet_sleep = quiet_sleep
+        self.quiet_after = quiet_after
+        self.notify = notify
+        self.ring = EventRing(buffer_size)
+
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the capture thread."""
+        if self._thread is not None:
+            return self
+        logger.info(f"[MIDI] - Listening on '{self.device_name}'")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._capture, name="midi-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture(self):
+        """Capture thread body: move events from the source into the ring."""
+        device, ring, read_size = self.source, self.ring, self.read_size
+        last_event = time.monotonic()
+        while not self._stop.is_set():
+            # When the ring is full leave events queued in PortMidi rather than drop them
+            if ring.free() < read_size or not device.poll():
+                # Poll less often once the keyboard has been quiet for a while
+                quiet = time.monotonic() - last_event > self.quiet_after
+                time.sleep(self.quiet_sleep if quiet else self.idle_sleep)
+                continue
+            for (status, data1, data2, _), timestamp in device.read(read_size):
+                ring.push(status, data1, data2, timestamp)
+            last_event = time.monotonic()
+            if not self._ready.is_set():
+                self._ready.set()
+                if self.notify is not None:
+                    self.notify()
+
+    def poll(self):
+        """True if captured events are waiting to be read."""
+        return len(self.ring) > 0
+
+    def read(self, max_events=None):
+        """Return all captured events (or at most `max_events`) as one batch."""
+        self._ready.clear()
+        return self.ring.pop_batch(max_events)
+
+    def time(self):
+        """Current time in ms on the clock of event timestamps."""
+        return self.source.time()
+
+    def read_messages(self, decoder):
+        """Return captured events decoded by `decoder`, a MidiDecoder."""
+        return decoder.decode(self.read())
+
+    def wait(self, timeout=None):
+        """Block until events are available or `timeout` seconds elapse."""
+        if self.poll():
+            return True
+        return self._ready.wait(timeout)
+
+    def close(self):
+        """Stop the capture thread and close the device."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.source.close()
+        logger.info(f"[MIDI] - Closed '{self.device_name}'")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,53 @@
+"""Note naming for MIDI note numbers.
+
+Every name is precomputed for the 128 MIDI notes when the module is imported,
+so formatting a note is a plain list index.
+"""
+
+NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+FLAT_NOTE_NAMES = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B']
+FRENCH_NOTE_NAMES = ['Do', 'Do#', 'Ré', 'Ré#', 'Mi', 'Fa', 'Fa#', 'Sol', 'Sol#', 'La', 'La#', 'Si']
+FRENCH_FLAT_NOTE_NAMES = ['Do', 'Réb', 'Ré', 'Mib', 'Mi', 'Fa', 'Solb', 'Sol', 'Lab', 'La', 'Sib', 'Si']
+
+WHITE_KEY_INDICES = [0, 2, 4, 5, 7, 9, 11]  # Indices for C, D, E, F, G, A, B
+
+MIDI_NOTES = range(128)
+
+# Per MIDI note tables
+OCTAVE = [n // 12 - 1 for n in MIDI_NOTES]
+IS_WHITE_KEY = [n % 12 in WHITE_KEY_INDICES for n in MIDI_NOTES]
+ENGLISH_NAMES = [NOTE_NAMES[n % 12] for n in MIDI_NOTES]
+FRENCH_NAMES = [FRENCH_NOTE_NAMES[n % 12] for n in MIDI_NOTES]
+FRENCH_FLAT_NAMES = [FRENCH_FLAT_NOTE_NAMES[n % 12] for n in MIDI_NOTES]
+SCIENTIFIC_NAMES = [f"{NOTE_NAMES[n % 12]}{OCTAVE[n]}" for n in MIDI_NOTES]  # C4 is middle C
+SCIENTIFIC_FLAT_NAMES = [f"{FLAT_NOTE_NAMES[n % 12]}{OCTAVE[n]}" for n in MIDI_NOTES]
+
+
+def _build_name_index():
+    """Map every spelling of a note with its octave (C#4, Db4, Do#4, Réb4) to its MIDI number."""
+    index = {}
+    for n in MIDI_NOTES:
+        pitch_class, octave = n % 12, OCTAVE[n]
+        for names in (NOTE_NAMES, FLAT_NOTE_NAMES, FRENCH_NOTE_NAMES, FRENCH_FLAT_NOTE_NAMES):
+            name = names[pitch_class]
+            index[f"{name}{octave}"] = n
+            index[f"{name.replace('é', 'e')}{octave}"] = n  # Accept "Re" for "Ré"
+    return index
+
+
+_NAME_INDEX = _build_name_index()
+
+
+def note_to_string(note_number):
+    """Scientific pitch name of a MIDI note, e.g. 60 -> 'C4'."""
+    return SCIENTIFIC_NAMES[note_number]
+
+
+def get_french_note(note_number):
+    """French name of a MIDI note without octave, e.g. 61 -> 'Do#'."""
+    return FRENCH_NAMES[note_number]
+
+
+def note_from_name(name):
+    """MIDI number of a note name with octave ('C#4', 'Db4', 'Do#4', 'Réb4'), raises KeyError if unknown."""
+    return _NAME_INDEX[name]
@@ -0,0 +1,133 @@
+"""MIDI output: thru, prompted notes and scheduled sequences.
+
+Messages are sent with timestamps in batches through one `write` call, so
+PortMidi schedules them itself (with its output latency) instead of the
+application timing each note. LoopbackPort stands in for a device in tests
+and headless runs: what is written comes back as an input source.
+"""
+
+import heapq
+import time
+
+import pygame.midi
+
+from piano.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_WRITE_EVENTS = 1024  # pygame.midi.Output.write limit per call
+
+
+class PortMidiPort:
+    """Physical MIDI output device through pygame.midi."""
+
+    def __init__(self, device_id=None, latency=10, buffer_size=4096):
+        """Open the device, the default output when `device_id` is None.
+
+        `latency` (ms) must be above 0 for PortMidi to honor timestamps.
+        """
+        if not pygame.midi.get_init():
+            pygame.midi.init()
+        if device_id is None:
+            device_id = pygame.midi.get_default_output_id()
+        if device_id == -1:
+            raise RuntimeError("No MIDI output device found.")
+        self.device_id = device_id
+        info = pygame.midi.get_device_info(device_id)
+        self.name = info[1].decode(errors="replace") if info else f"Device {device_id}"
+        self._device = pygame.midi.Output(device_id, latency, buffer_size)
+
+    def write(self, events):
+        self._device.write(events)
+
+    def time(self):
+        return pygame.midi.time()
+
+    def close(self):
+        self._device.close()
+
+
+class LoopbackPort:
+    """Output port whose messages come back as a MIDI input source.
+
+    Written events are held until their timestamp, then returned by `read`
+    like a keyboard would, so it can be passed to MidiInput.
+    """
+
+    def __init__(self, name="Loopback"):
+        self.name = name
+        self.written = 0
+        self._start = time.perf_counter()
+        self._pending = []  # Heap of (timestamp, order, data)
+
+    def time(self):
+        return int((time.perf_counter() - self._start) * 1000)
+
+    def write(self, events):
+        for data, timestamp in events:
+            heapq.heappush(self._pending, (timestamp, self.written, data))
+            self.written += 1
+
+    def poll(self):
+        return bool(self._pending) and self._pending[0][0] <= self.time()
+
+    def read(self, max_events):
+        now = self.time()
+        batch = []
+        while self._pending and len(batch) < max_events and self._pending[0][0] <= now:
+            timestamp, _, data = heapq.heappop(self._pending)
+            batch.append([list(data[:3]) + [0], timestamp])
+        return batch
+
+    def close(self):
+        self._pending.clear()
+
+
+class MidiOutput:
+    """Sends MIDI messages to a port, by default the MIDI output device."""
+
+    def __init__(self, port=None, device_id=None, latency=10):
+        self.port = port or PortMidiPort(device_id, latency)
+        self.device_name = self.port.name
+        logger.info(f"[MIDI] - Output to '{self.device_name}'")
+
+    def time(self):
+        """Current time in ms on the port's clock."""
+        return self.port.time()
+
+    def write(self, events):
+        """Send [[status, d1, d2], timestamp] events, in as few writes as possible."""
+        for start in range(0, len(events), MAX_WRITE_EVENTS):
+            self.port.write(events[start:start + MAX_WRITE_EVENTS])
+
+    def thru(self, events):
+        """Echo an input batch, channel messages only, as soon as possible."""
+        now = self.port.time()
+        self.write([[[status, data1, data2], now]
+                    for (status, data1, data2, _), _ in events if 0x80 <= status < 0xF0])
+
+    def play_note(self, note, velocity=100, duration_ms=500, channel=1, at=None):
+        """Play one note, starting at `at` ms on the port's clock (now when None)."""
+        self.schedule([(note, velocity, 0, duration_ms)], channel, at)
+
+    def schedule(self, sequence, channel=1, start=None):
+        """Queue (note, velocity, offset_ms, duration_ms) notes, offsets relative to `start`.
+
+        Every note-on and note-off is timestamped and sent in one batch, PortMidi
+        then emits them on time.
+        """
+        start = self.port.time() if start is None else start
+        on, off = 0x90 | (channel - 1), 0x80 | (channel - 1)
+        events = []
+        for note, velocity, offset, duration in sequence:
+            events.append((start + offset, 1, [on, note, velocity]))
+            events.append((start + offset + duration, 0, [off, note, 0]))
+        events.sort(key=lambda event: event[:2])  # Note-offs first when times are equal
+        self.write([[data, timestamp] for timestamp, _, data in events])
+
+    def all_notes_off(self, channel=1):
+        """Silence every note on `channel` (controller 123)."""
+        self.write([[[0xB0 | (channel - 1), 123, 0], self.port.time()]])
+
+    def close(self):
+        self.port.close()
@@ -0,0 +1,165 @@
+"""Standard MIDI File (.mid) export and import.
+
+Sessions are exported as a format 0 file with one tick per millisecond so they
+open in any DAW. Files are read lazily: each track is parsed by its own
+generator straight from the file and tracks are merged on the fly, so memory
+stays flat whatever the file size.
+"""
+
+import heapq
+import struct
+
+HEADER_CHUNK = b'MThd'
+TRACK_CHUNK = b'MTrk'
+
+# Exported files use 1000 ticks per beat at 60 BPM, i.e. one tick per millisecond
+EXPORT_DIVISION = 1000
+EXPORT_TEMPO = 1_000_000  # Microseconds per beat
+DEFAULT_TEMPO = 500_000   # 120 BPM, tempo of files without a tempo event
+
+META_END_OF_TRACK = 0x2F
+META_SET_TEMPO = 0x51
+META_TRACK_NAME = 0x03
+
+DRUM_CHANNEL = 10  # General MIDI percussion, not a melody
+
+
+def _vlq(value):
+    """Encode a variable-length quantity."""
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def _read_vlq(f):
+    value = 0
+    while True:
+        byte = f.read(1)[0]
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value
+
+
+def _data_length(status):
+    """Number of data bytes following a channel message status."""
+    return 1 if status & 0xF0 in (0xC0, 0xD0) else 2
+
+
+def write_smf(path, events, track_name=None):
+    """Write pygame.midi events ([[status, d1, d2, d3], timestamp ms]) to a format 0 file.
+
+    `events` can be any iterable, e.g. a generator over a session file; the
+    track is streamed to disk and its length filled in at the end.
+    """
+    with open(path, 'wb') as f:
+        f.write(HEADER_CHUNK + struct.pack('>IHHH', 6, 0, 1, EXPORT_DIVISION))
+        f.write(TRACK_CHUNK + b'\0\0\0\0')
+        start = f.tell()
+
+        f.write(b'\0' + bytes([0xFF, META_SET_TEMPO, 3]) + EXPORT_TEMPO.to_bytes(3, 'big'))
+        if track_name:
+            name = track_name.encode()
+            f.write(b'\0' + bytes([0xFF, META_TRACK_NAME]) + _vlq(len(name)) + name)
+
+        first = last = None
+        for (status, data1, data2, _), timestamp in events:
+            if status < 0x80 or status >= 0xF0:
+                continue  # Only channel messages are exported
+            if first is None:
+                first = last = timestamp
+            delta = max(timestamp - last, 0)
+            last = max(timestamp, last)
+            message = bytes([status, data1, data2][:1 + _data_length(status)])
+            f.write(_vlq(delta) + message)
+        f.write(b'\0' + bytes([0xFF, META_END_OF_TRACK, 0]))
+
+        end = f.tell()
+        f.seek(start - 4)
+        f.write(struct.pack('>I', end - start))
+
+
+class MidiFile:
+    """Lazy reader of a Standard MIDI File.
+
+    Only the chunk table is read when opening; events are parsed while they
+    are iterated.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.chunks = []  # (offset, length) of each track
+        with open(path, 'rb') as f:
+            chunk, length = struct.unpack('>4sI', f.read(8))
+            if chunk != HEADER_CHUNK:
+                raise ValueError(f"{path} is not a Standard MIDI File")
+            self.format, self.track_count, self.division = struct.unpack('>HHh', f.read(6))
+            f.seek(8 + length)
+            while len(self.chunks) < self.track_count:
+                header = f.read(8)
+                if len(header) < 8:
+                    break
+                chunk, length = struct.unpack('>4sI', header)
+                if chunk == TRACK_CHUNK:
+                    self.chunks.append((f.tell(), length))
+                f.seek(length, 1)  # Unknown chunks are skipped
+
+    def track(self, index):
+        """Yield (tick, status, data) for one track, data being (meta type, bytes) for meta events."""
+        offset, length = self.chunks[index]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            end = offset + length
+            tick = running = 0
+            while f.tell() < end:
+                tick += _read_vlq(f)
+                status = f.read(1)[0]
+                if status == 0xFF:
+                    meta_type = f.read(1)[0]
+                    data = f.read(_read_vlq(f))
+                    yield tick, status, (meta_type, data)
+                    if meta_type == META_END_OF_TRACK:
+                        return
+                elif status in (0xF0, 0xF7):
+                    f.seek(_read_vlq(f), 1)  # System exclusive messages are skipped
+                else:
+                    if status < 0x80:
+                        data1, status = status, running  # Running status
+                    else:
+                        running = status
+                        data1 = f.read(1)[0]
+                    data2 = f.read(1)[0] if _data_length(status) == 2 else 0
+                    yield tick, status, (data1, data2)
+
+    def _ms_per_tick(self, tempo):
+        if self.division < 0:
+            # SMPTE division: frames per second (negative high byte) and ticks per frame
+            frames, ticks = -(self.division >> 8), self.division & 0xFF
+            return 1000.0 / (frames * ticks)
+        return tempo / 1000.0 / self.division
+
+    def events(self):
+        """Yield channel messages of all tracks in time order, in pygame.midi format with ms timestamps."""
+        tracks = [self.track(i) for i in range(len(self.chunks))]
+        ms_per_tick = self._ms_per_tick(DEFAULT_TEMPO)
+        ms = 0.0
+        last_tick = 0
+        for tick, status, data in heapq.merge(*tracks, key=lambda event: event[0]):
+            ms += (tick - last_tick) * ms_per_tick
+            last_tick = tick
+            if status == 0xFF:
+                meta_type, payload = data
+                if meta_type == META_SET_TEMPO:
+                    ms_per_tick = self._ms_per_tick(int.from_bytes(payload, 'big'))
+                continue
+            yield [[status, data[0], data[1], 0], round(ms)]
+
+    def melody(self, channel=None):
+        """Yield the notes of every note-on of `channel` (1-16), by default of every channel but drums."""
+        skipped = DRUM_CHANNEL - 1
+        for (status, note, velocity, _), _ in self.events():
+            if status & 0xF0 == 0x90 and velocity:
+                if status & 0x0F == channel - 1 if channel else status & 0x0F != skipped:
+                    yield note
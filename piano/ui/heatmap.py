@@ -0,0 +1,113 @@
+"""Per-key accuracy and reaction time overlay for the on-screen keyboard.
+
+Attempts are appended to compact arrays; the per-key aggregates are computed
+with NumPy over those arrays in one pass (`bincount`, no loop over attempts)
+and drawn into a translucent surface that is kept until new attempts arrive,
+so showing the overlay costs one blit per frame. NumPy is optional
+(`pip install piano[audio]`); without it the overlay is disabled.
+"""
+
+from array import array
+
+import pygame
+
+from piano.core.logger import get_logger
+from piano.core.practice import MAX_LATENCY_MS
+from piano.ui.widgets import is_black_key
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+logger = get_logger(__name__)
+
+OVERLAY_ALPHA = 140
+LATENCY_COLOR = (30, 30, 30, 170)
+
+
+class KeyHeatmap:
+    """Accuracy (key color) and mean reaction time (bar height) per key of a KeyboardWidget."""
+
+    def __init__(self, keyboard):
+        self.keyboard = keyboard
+        self.enabled = np is not None
+        if not self.enabled:
+            logger.warning("[Heatmap] - NumPy is not installed, the heatmap is disabled")
+            return
+        self.target = array('B')
+        self.correct = array('B')
+        self.latency = array('H')
+        # Totals of earlier sessions, per note
+        self.base_count = np.zeros(128)
+        self.base_correct = np.zeros(128)
+        self.base_latency = np.zeros(128)
+        self._surface = None
+
+    def seed(self, note_stats):
+        """Start from earlier totals, {note: (attempts, correct, mean latency ms)} as AttemptStore.note_stats."""
+        if not self.enabled or not note_stats:
+            return
+        notes = np.fromiter(note_stats, dtype=np.intp, count=len(note_stats))
+        totals = np.array(list(note_stats.values()), dtype=float)
+        self.base_count[notes] = totals[:, 0]
+        self.base_correct[notes] = totals[:, 1]
+        self.base_latency[notes] = totals[:, 0] * totals[:, 2]
+        self._surface = None
+
+    def add(self, target, correct, latency_ms):
+        """Count one attempt, the overlay is redrawn on its next use."""
+        if not self.enabled:
+            return
+        self.target.append(target)
+        self.correct.append(bool(correct))
+        self.latency.append(min(max(int(latency_ms), 0), MAX_LATENCY_MS))
+        self._surface = None
+
+    def aggregates(self):
+        """(attempts, accuracy, mean latency ms) arrays indexed by note, NaN for keys never prompted."""
+        target = np.frombuffer(self.target, dtype=np.uint8)
+        count = self.base_count + np.bincount(target, minlength=128)
+        correct = self.base_correct + np.bincount(
+            target, weights=np.frombuffer(self.correct, dtype=np.uint8), minlength=128)
+        latency = self.base_latency + np.bincount(
+            target, weights=np.frombuffer(self.latency, dtype=np.uint16), minlength=128)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return count, correct / count, latency / count
+
+    def _render(self):
+        keyboard = self.keyboard
+        surface = pygame.Surface(keyboard.rect.size, pygame.SRCALPHA)
+        count, accuracy, latency = self.aggregates()
+        played = count > 0
+        if not played.any():
+            return surface
+        # Red (always wrong) to green (always right), bar heights relative to the slowest key
+        colors = np.zeros((128, 4), dtype=np.uint8)
+        colors[:, 0] = np.nan_to_num(220 * (1 - accuracy)).astype(np.uint8)
+        colors[:, 1] = np.nan_to_num(180 * accuracy).astype(np.uint8)
+        colors[:, 2] = 40
+        colors[:, 3] = OVERLAY_ALPHA
+        bars = np.nan_to_num(latency / np.nanmax(latency[played]))
+
+        offset = (-keyboard.rect.x, -keyboard.rect.y)
+        # White keys first, black keys are drawn over them
+        for black in (False, True):
+            for note, key_rect in keyboard.key_rects.items():
+                if is_black_key(note) != black or not played[note]:
+                    continue
+                key_rect = key_rect.move(offset)
+                pygame.draw.rect(surface, colors[note].tolist(), key_rect)
+                bar = key_rect.inflate(-key_rect.width // 2, 0)
+                bar.height = max(int(key_rect.height * 0.3 * bars[note]), 1)
+                bar.bottom = key_rect.bottom - 2
+                pygame.draw.rect(surface, LATENCY_COLOR, bar)
+        return surface
+
+    def draw(self, surface):
+        """Blit the overlay on the keyboard, rebuilt only after new attempts or a resize."""
+        if not self.enabled:
+            return
+        if self._surface is None or self._surface.get_size() != self.keyboard.rect.size:
+            self._surface = self._render()
+        surface.blit(self._surface, self.keyboard.rect.topleft)
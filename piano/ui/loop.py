@@ -0,0 +1,136 @@
+"""Frame scheduling for the pygame main loops.
+
+By default the loop sleeps in `pygame.event.wait` until something happens
+(user input, a MIDI wakeup, an animation deadline) and redraws only when the
+state was marked dirty. A fixed frame rate can still be requested, either for
+the whole run or for the duration of an animation.
+"""
+
+import heapq
+import math
+import time
+
+import pygame
+
+from piano.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Posted from other threads (e.g. MIDI capture) to wake up an idle loop
+WAKEUP_EVENT = pygame.event.custom_type()
+
+# Idle budget: CPU seconds used per minute spent waiting for input (about 1% of a core)
+IDLE_CPU_TARGET = 0.6
+IDLE_REPORT_INTERVAL = 60.0
+
+
+class FrameScheduler:
+    """Decides when the main loop wakes up and whether it must redraw."""
+
+    def __init__(self, fps=None, animation_fps=60, idle_timeout_ms=1000):
+        """Use `fps` for a fixed frame rate, None for the event-driven idle mode."""
+        self.fps = fps
+        self.animation_fps = animation_fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.dirty = True
+        self._animate_until = 0
+        self._next_frame = 0  # Tick at which the next frame is due in frame-rate mode
+        self._wake_times = []  # Heap of ticks at which `wait_events` must return
+
+        # Idle CPU accounting, only loop iterations spent in idle mode are counted
+        self._idle_cpu = 0.0
+        self._idle_wall = 0.0
+        self._reported_wall = 0.0
+
+    def mark_dirty(self):
+        """Request a redraw on the next frame."""
+        self.dirty = True
+
+    def animate(self, duration_ms):
+        """Keep redrawing at `animation_fps` for the next `duration_ms` milliseconds."""
+        self._animate_until = max(self._animate_until, pygame.time.get_ticks() + duration_ms)
+        self.dirty = True
+
+    def animating(self):
+        """True while an animation requires continuous redraws."""
+        if not self._animate_until:
+            return False
+        if pygame.time.get_ticks() <= self._animate_until:
+            return True
+        # Animation just ended, one last frame clears it from the screen
+        self._animate_until = 0
+        self.dirty = True
+        return False
+
+    def wake_in(self, delay_ms):
+        """Make `wait_events` return after `delay_ms` at the latest, e.g. to hide a message on time.
+
+        Unlike `animate`, nothing is redrawn in between.
+        """
+        heapq.heappush(self._wake_times, pygame.time.get_ticks() + delay_ms)
+
+    @staticmethod
+    def wakeup():
+        """Wake up a loop blocked in `wait_events`, safe to call from any thread."""
+        pygame.event.post(pygame.event.Event(WAKEUP_EVENT))
+
+    def wait_events(self):
+        """Return pending events, blocking until one arrives, the next frame or a wake time is due.
+
+        Every wait is a `pygame.event.wait`, so a `wakeup` (e.g. MIDI input)
+        ends it at once, also while animating or at a fixed frame rate.
+        """
+        now = pygame.time.get_ticks()
+        wake_times = self._wake_times
+        while wake_times and wake_times[0] <= now:
+            heapq.heappop(wake_times)
+        timeout = wake_times[0] - now if wake_times else None
+
+        if self.fps or self.animating():
+            period = 1000 / (self.fps or self.animation_fps)
+            if now >= self._next_frame:
+                # Due, or late: the following frame is one period from now
+                self._next_frame = max(self._next_frame + period, now)
+            frame_timeout = self._next_frame - now
+            timeout = frame_timeout if timeout is None else min(timeout, frame_timeout)
+            return self._wait(timeout)
+
+        wall, cpu = time.monotonic(), time.process_time()
+        events = self._wait(self.idle_timeout_ms if timeout is None else min(timeout, self.idle_timeout_ms))
+        self._account_idle(time.monotonic() - wall, time.process_time() - cpu)
+        return events
+
+    @staticmethod
+    def _wait(timeout_ms):
+        """Events arriving within `timeout_ms`, returns as soon as there is one."""
+        timeout_ms = math.ceil(timeout_ms)  # Rounded down, the wait would end before the deadline
+        if timeout_ms <= 0:
+            return pygame.event.get()  # pygame.event.wait(0) would block forever
+        first = pygame.event.wait(timeout_ms)
+        events = [] if first.type == pygame.NOEVENT else [first]
+        events.extend(pygame.event.get())
+        return events
+
+    def needs_redraw(self):
+        """True when a frame must be drawn, clears the dirty flag."""
+        dirty = self.dirty or self.animating()
+        self.dirty = False
+        return dirty
+
+    def _account_idle(self, wall, cpu):
+        self._idle_wall += wall
+        self._idle_cpu += cpu
+        if self._idle_wall - self._reported_wall < IDLE_REPORT_INTERVAL:
+            return
+        self._reported_wall = self._idle_wall
+        usage = self.idle_cpu_per_minute()
+        if usage > IDLE_CPU_TARGET:
+            logger.warning(f"[Loop] - Idle CPU {usage:.2f}s/min above target {IDLE_CPU_TARGET}s/min")
+        else:
+            logger.debug(f"[Loop] - Idle CPU {usage:.2f}s/min")
+
+    def idle_cpu_per_minute(self):
+        """Process CPU seconds consumed per minute of idle waiting."""
+        if not self._idle_wall:
+            return 0.0
+        return self._idle_cpu / self._idle_wall * 60.0
@@ -0,0 +1,46 @@
+"""Dirty-rectangle presentation of the screen surface."""
+
+import pygame
+
+
+class DirtyRenderer:
+    """Collects the screen regions changed since the last frame.
+
+    Widgets invalidate the rectangles they cover, the screen redraws only the
+    sections that intersect them and `present` pushes just those regions to
+    the display. A full flip is used after a resize or expose.
+    """
+
+    def __init__(self, screen):
+        """Track changes on `screen`, the surface returned by `pygame.display.set_mode`."""
+        self.screen = screen
+        self.rects = []
+        self.full = True  # First frame always paints the whole window
+
+    def invalidate(self, rect):
+        """Mark `rect` as changed."""
+        if not self.full:
+            self.rects.append(pygame.Rect(rect))
+
+    def invalidate_all(self):
+        """Mark the whole screen as changed."""
+        self.full = True
+        self.rects.clear()
+
+    def resize(self, screen):
+        """Switch to the new display surface after a VIDEORESIZE."""
+        self.screen = screen
+        self.invalidate_all()
+
+    def needs(self, rect):
+        """True if `rect` overlaps a changed region and must be redrawn."""
+        return self.full or pygame.Rect(rect).collidelist(self.rects) != -1
+
+    def present(self):
+        """Push changed regions to the display and start a new frame."""
+        if self.full:
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.full = False
+        self.rects.clear()
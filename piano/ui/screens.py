@@ -2,13 +2,29 @@
 
 import pygame
 import sys
+import time
+from datetime import date
+
+from piano.core.attempts import AttemptStore
+from piano.core.practice import NotePool
+from piano.core.probes import TimingProbes
+from piano.midi.input import MidiDecoder, MidiInput, NoteOn
+from piano.midi.notes import note_to_string
+from piano.ui.loop import FrameScheduler
+from piano.ui.text import render_text, text_cache
+
+HUD_REFRESH_MS = 250  # While shown the HUD is redrawn at least this often, idle or not
 
 
 class MainWindow:
     """Main application window with menu bar and content area."""
     
-    def __init__(self, width=800, height=600):
-        """Initialize the main window."""
+    def __init__(self, width=800, height=600, fps=None, midi_input=None, store=None):
+        """Initialize the main window, `fps` forces a fixed frame rate instead of idle redraws.
+
+        Attempts are saved to `store`, an AttemptStore, without it they are not saved
+        and the Statistics screen is not available.
+        """
         pygame.init()
         
         # Window setup
@@ -37,14 +53,38 @@ class MainWindow:
         self.active_dropdown = None
         self.midi_device_name = "No MIDI Device"
         self.running = True
-        self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(fps)
+        
+        # Performance HUD, toggled with F3
+        self.probes = TimingProbes(("events", "midi", "draw", "flip", "frame", "interval"))
+        self.show_hud = False
+        self.hud_font = pygame.font.Font(None, 18)
+        self.hud_background = pygame.Surface((330, 70), pygame.SRCALPHA)
+        self.hud_background.fill((0, 0, 0, 170))
+        self.midi_queue_depth = 0
+        self._last_frame = None
+        
+        # Content screens, built once at startup
+        self.store = store
+        clock = midi_input.time if midi_input is not None else None
+        self.screens = {"Sight reading": SightReadingScreen(self.font, store=store, clock=clock)}
+        if store is not None:
+            self.screens["Statistics"] = StatsScreen(self.font, store)
+        self.active_screen = None
+        
+        # MIDI input, optional
+        self.midi_input = midi_input
+        self.midi_decoder = MidiDecoder(kinds=(NoteOn,))
+        if midi_input is not None:
+            midi_input.notify = self.scheduler.wakeup
+            self.set_midi_device(midi_input.device_name)
             
     def init_menus(self):
         """Initialize menu structure and positions."""
         self.menus = [
             {
                 "name": "File",
-                "items": ["Item"],
+                "items": ["Home", "Sight reading", "Statistics"],
                 "rect": pygame.Rect(10, 0, 60, self.menu_height),
                 "dropdown_rects": []
             },
@@ -83,6 +123,9 @@ class MainWindow:
             if event.button == 1:  # Left click
                 self.handle_menu_click(event.pos)
                 
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.show_hud = not self.show_hud
+            
         elif event.type == pygame.VIDEORESIZE:
             # Update screen size when window is resized
             self.screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
@@ -115,6 +158,11 @@ class MainWindow:
         """Handle menu item selection."""
         print(f"Clicked: {menu_name} -> {item_name}")
         
+        if menu_name == "File":
+            self.active_screen = self.screens.get(item_name)  # "Home" shows the title
+            if hasattr(self.active_screen, "refresh"):
+                self.active_screen.refresh()
+            
         if menu_name == "Edit" and item_name == "Preferences":
             print("Opening preferences...")  # Placeholder for future
             
@@ -133,7 +181,7 @@ class MainWindow:
                 pygame.draw.rect(self.screen, self.menu_hover_color, menu["rect"])
             
             # Draw menu text
-            text = self.menu_font.render(menu["name"], True, self.text_color)
+            text = render_text(self.menu_font, menu["name"], True, self.text_color)
             text_rect = text.get_rect(center=menu["rect"].center)
             self.screen.blit(text, text_rect)
             
@@ -142,7 +190,7 @@ class MainWindow:
                 self.draw_dropdown(menu)
         
         # Draw MIDI device label on the right
-        midi_text = self.menu_font.render(f"MIDI: {self.midi_device_name}", True, self.text_color)
+        midi_text = render_text(self.menu_font, f"MIDI: {self.midi_device_name}", True, self.text_color)
         midi_rect = midi_text.get_rect(midright=(self.screen.get_width() - 20, self.menu_height // 2))
         self.screen.blit(midi_text, midi_rect)
         
@@ -174,45 +222,364 @@ class MainWindow:
                 pygame.draw.rect(self.screen, self.menu_hover_color, rect)
             
             # Draw item text
-            text = self.menu_font.render(item, True, self.text_color)
+            text = render_text(self.menu_font, item, True, self.text_color)
             text_rect = text.get_rect(midleft=(rect.x + 10, rect.centery))
             self.screen.blit(text, text_rect)
     
     def draw_content(self):
         """Draw the main content area."""
+        if self.active_screen is not None:
+            content_rect = pygame.Rect(0, self.menu_height + 1, self.screen.get_width(),
+                                       self.screen.get_height() - self.menu_height - 1)
+            self.active_screen.draw(self.screen, content_rect)
+            return
+        
         # Calculate center position for title
-        title_text = self.title_font.render("Piano Practice V1", True, self.text_color)
+        title_text = render_text(self.title_font, "Piano Practice V1", True, self.text_color)
         title_rect = title_text.get_rect(
             center=(self.screen.get_width() // 2, 
                    self.screen.get_height() // 2)
         )
         self.screen.blit(title_text, title_rect)
     
+    def draw_hud(self):
+        """Draw frame rate, frame and section times, MIDI backlog and text cache hit rate."""
+        probes = self.probes
+        interval = probes["interval"].mean()
+        depth = self.midi_queue_depth if self.midi_input is not None else "n/a"
+        lines = [
+            f"FPS {1000 / interval if interval else 0:.1f} | frame p99 {probes['frame'].percentile(99):.2f} ms",
+            f"p99 ms: events {probes['events'].percentile(99):.2f} | midi {probes['midi'].percentile(99):.2f}"
+            f" | draw {probes['draw'].percentile(99):.2f} | flip {probes['flip'].percentile(99):.2f}",
+            f"MIDI queue {depth} | text cache hit rate {text_cache.hit_rate():.0%}",
+        ]
+        rect = self.hud_background.get_rect(bottomleft=(10, self.screen.get_height() - 10))
+        self.screen.blit(self.hud_background, rect)
+        for i, line in enumerate(lines):
+            # Rendered directly: changing every frame, they would only churn the text cache
+            text = self.hud_font.render(line, True, (255, 255, 255))
+            self.screen.blit(text, (rect.x + 8, rect.y + 8 + i * 20))
+    
     def draw(self):
         """Draw everything on screen."""
-        self.screen.fill(self.bg_color)
-        self.draw_menu_bar()
-        self.draw_content()
-        pygame.display.flip()
+        with self.probes.section("draw"):
+            self.screen.fill(self.bg_color)
+            self.draw_menu_bar()
+            self.draw_content()
+            if self.show_hud:
+                self.draw_hud()
+        with self.probes.section("flip"):
+            pygame.display.flip()
     
     def run(self):
         """Main application loop."""
+        probes = self.probes
         while self.running:
-            for event in pygame.event.get():
-                self.handle_event(event)
+            events = self.scheduler.wait_events()
+            frame_start = time.perf_counter()
+            with probes.section("events"):
+                for event in events:
+                    self.handle_event(event)
+                    self.scheduler.mark_dirty()  # Menus follow the mouse, any event may change the view
             
-            self.draw()
-            self.clock.tick(60)  # 60 FPS
+            if self.midi_input is not None:
+                with probes.section("midi"):
+                    self.midi_queue_depth = len(self.midi_input.ring)
+                    if self.midi_input.poll():
+                        for message in self.midi_input.read_messages(self.midi_decoder):
+                            if self.active_screen is not None:
+                                self.active_screen.handle_note(message.note, message.timestamp)
+                        self.scheduler.mark_dirty()
+            
+            if self.show_hud and self._last_frame is not None \
+                    and (frame_start - self._last_frame) * 1000 >= HUD_REFRESH_MS:
+                self.scheduler.mark_dirty()
+            
+            if self.scheduler.needs_redraw():
+                self.draw()
+                now = time.perf_counter()
+                # Whole frame: events, MIDI, draw and flip, without the wait for events
+                probes.add("frame", (now - frame_start) * 1000)
+                if self.show_hud:
+                    self.scheduler.wake_in(HUD_REFRESH_MS)
+                if self._last_frame is not None:
+                    probes.add("interval", (now - self._last_frame) * 1000)
+                self._last_frame = now
         
+        if self.midi_input is not None:
+            self.midi_input.close()
+        if self.store is not None:
+            self.store.close()
         pygame.quit()
         sys.exit()
     
     def set_midi_device(self, device_name):
         """Update the MIDI device name display."""
         self.midi_device_name = device_name
+        self.scheduler.mark_dirty()
+
+
+
+# Diatonic step of each pitch class, sharps sit on the natural below
+LETTER_STEPS = [0, 0, 1, 1, 2, 3, 3, 4, 4, 5, 5, 6]
+SHARP_PITCH_CLASSES = {1, 3, 6, 8, 10}
+
+
+def diatonic_step(note):
+    """Staff position of a MIDI note, counted in lines and spaces from C-1."""
+    return (note // 12) * 7 + LETTER_STEPS[note % 12]
+
+
+TREBLE_BOTTOM_STEP = diatonic_step(64)  # E4, bottom line of the treble staff
+BASS_BOTTOM_STEP = diatonic_step(43)    # G2, bottom line of the bass staff
+
+
+class StaffAtlas:
+    """Sprites for staff notation, drawn once into a single surface.
+
+    Staff lines, clefs, notehead, ledger line and sharp are packed side
+    by side; `blit_args` returns what `Surface.blits` needs to draw one of them.
+    """
+
+    def __init__(self, line_spacing=12, staff_width=320, color=(0, 0, 0)):
+        self.line_spacing = line_spacing
+        self.staff_width = staff_width
+        self.color = color
+        s = line_spacing
+        sizes = {
+            "staff": (staff_width, 4 * s + 1),
+            "treble": (2 * s, 7 * s),
+            "bass": (2 * s, 3 * s),
+            "notehead": (int(1.4 * s), s),
+            "ledger": (int(1.4 * s) + 8, 1),
+            "sharp": (s, int(2.6 * s)),
+        }
+        width = sum(w for w, _ in sizes.values()) + 2 * len(sizes)
+        height = max(h for _, h in sizes.values())
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.rects = {}
+        x = 0
+        for name, (w, h) in sizes.items():
+            self.rects[name] = pygame.Rect(x, 0, w, h)
+            x += w + 2
+        self._draw_sprites()
+
+    def _draw_sprites(self):
+        s, color, surface = self.line_spacing, self.color, self.surface
+
+        r = self.rects["staff"]
+        for i in range(5):
+            pygame.draw.line(surface, color, (r.left, r.top + i * s), (r.right - 1, r.top + i * s))
+
+        # Treble clef: loop around the G line with a stem and a tail
+        r = self.rects["treble"]
+        g_line = r.top + 4 * s  # Second line from the bottom once placed on the staff
+        pygame.draw.circle(surface, color, (r.centerx, g_line), s // 2 + 3, 2)
+        pygame.draw.line(surface, color, (r.centerx + 2, r.top + 1), (r.centerx + 2, r.bottom - s), 2)
+        pygame.draw.arc(surface, color, pygame.Rect(r.centerx - s // 2, r.bottom - s - 2, s, s), 3.14, 6.28, 2)
+        pygame.draw.arc(surface, color, pygame.Rect(r.left + 2, r.top, r.width - 4, 2 * s), 0, 3.14, 2)
+
+        # Bass clef: curl around the F line and two dots
+        r = self.rects["bass"]
+        pygame.draw.arc(surface, color, pygame.Rect(r.left, r.top + s // 2, r.width - 6, 2 * s), -1.6, 3.14, 2)
+        pygame.draw.circle(surface, color, (r.left + 4, r.top + s), 3)
+        pygame.draw.circle(surface, color, (r.right - 2, r.top + s // 2), 2)
+        pygame.draw.circle(surface, color, (r.right - 2, r.top + s + s // 2), 2)
+
+        pygame.draw.ellipse(surface, color, self.rects["notehead"])
+        pygame.draw.line(surface, color, self.rects["ledger"].topleft, self.rects["ledger"].topright)
+
+        r = self.rects["sharp"]
+        pygame.draw.line(surface, color, (r.left + 3, r.top), (r.left + 3, r.bottom - 1))
+        pygame.draw.line(surface, color, (r.right - 4, r.top), (r.right - 4, r.bottom - 1))
+        pygame.draw.line(surface, color, (r.left, r.centery - s // 4 + 2), (r.right - 1, r.centery - s // 4 - 2), 2)
+        pygame.draw.line(surface, color, (r.left, r.centery + s // 4 + 2), (r.right - 1, r.centery + s // 4 - 2), 2)
+
+    def blit_args(self, name, pos):
+        """(atlas, destination, area) for one sprite, `pos` being its top-left corner."""
+        return self.surface, pos, self.rects[name]
+
+
+class SightReadingScreen:
+    """Shows the target note on a treble or bass staff.
+
+    The blits of a prompt are computed once when the target changes, drawing a
+    frame is then a single `Surface.blits` call. Prompts are stamped with
+    `clock`, the clock of the MIDI event timestamps (e.g. `MidiInput.time`),
+    so reaction times do not include the wakeup and frame delays.
+    """
+
+    def __init__(self, font, pool=None, atlas=None, store=None, clock=None):
+        self.font = font
+        self.atlas = atlas or StaffAtlas()
+        self.pool = pool or NotePool(range(2, 6))
+        self.store = store
+        self.clock = clock or pygame.time.get_ticks
+        self.target = None
+        self.prompt_time = 0
+        self.feedback = ""
+        self._blits = []
+        self._origin = None
+        self.next_target()
+
+    def next_target(self):
+        self.target = self.pool.sample()
+        self.prompt_time = self.clock()
+        self._blits = []  # Rebuilt on the next draw, where the staff position is known
+
+    def handle_note(self, note, timestamp):
+        """Check a played note against the target."""
+        if self.store is not None:
+            latency = max(timestamp - self.prompt_time, 0)
+            self.store.add(self.target, note, note == self.target, latency)
+        if note == self.target:
+            self.feedback = f"{note_to_string(note)}: correct"
+            self.next_target()
+        else:
+            self.feedback = f"{note_to_string(note)}: try again"
+
+    def _layout(self, origin):
+        """Sprite blits of the current target, the staff's top-left corner being `origin`."""
+        atlas, s = self.atlas, self.atlas.line_spacing
+        x, top = origin
+        treble = self.target >= 60
+        bottom_step = TREBLE_BOTTOM_STEP if treble else BASS_BOTTOM_STEP
+        bottom_y = top + 4 * s
+        step = diatonic_step(self.target)
+
+        def step_y(st):
+            return bottom_y - (st - bottom_step) * s // 2
+
+        blits = [atlas.blit_args("staff", (x, top))]
+        if treble:
+            blits.append(atlas.blit_args("treble", (x + 6, top - s)))
+        else:
+            blits.append(atlas.blit_args("bass", (x + 6, top)))
+
+        head = atlas.rects["notehead"]
+        note_x = x + atlas.staff_width // 2
+        ledger_x = note_x - 4
+        ledger_steps = list(range(bottom_step - 2, step - 1, -2)) + list(range(bottom_step + 10, step + 1, 2))
+        for st in ledger_steps:
+            blits.append(atlas.blit_args("ledger", (ledger_x, step_y(st))))
+        if self.target % 12 in SHARP_PITCH_CLASSES:
+            sharp = atlas.rects["sharp"]
+            blits.append(atlas.blit_args("sharp", (note_x - sharp.width - 4, step_y(step) - sharp.height // 2)))
+        blits.append(atlas.blit_args("notehead", (note_x, step_y(step) - head.height // 2)))
+        return blits
+
+    def draw(self, surface, rect):
+        origin = (rect.centerx - self.atlas.staff_width // 2, rect.centery - 2 * self.atlas.line_spacing)
+        if not self._blits or origin != self._origin:
+            self._blits = self._layout(origin)
+            self._origin = origin
+        surface.blits(self._blits, doreturn=False)
+
+        prompt = render_text(self.font, "Play the note shown on the staff", True, (0, 0, 0))
+        surface.blit(prompt, prompt.get_rect(midtop=(rect.centerx, rect.top + 30)))
+        if self.feedback:
+            feedback = render_text(self.font, self.feedback, True, (80, 80, 80))
+            surface.blit(feedback, feedback.get_rect(midbottom=(rect.centerx, rect.bottom - 30)))
+
+
+def accuracy_color(accuracy):
+    """Red to green color of an accuracy between 0 and 1."""
+    accuracy = min(max(accuracy, 0.0), 1.0)
+    return (int(220 * (1 - accuracy)), int(180 * accuracy), 40)
+
+
+class StatsScreen:
+    """Accuracy and reaction time statistics from the attempt store.
+
+    The store is queried when the screen is opened (`refresh`), the charts are
+    then drawn into a cached surface so a frame only blits it.
+    """
+
+    def __init__(self, font, store, days=30):
+        self.font = font
+        self.store = store
+        self.days = days
+        self._surface = None
+        self._notes = {}
+        self._octaves = {}
+        self._trend = []
+        self._totals = (0, 0.0)
+
+    def refresh(self):
+        """Reload the statistics, attempts still queued are written first."""
+        self.store.flush()
+        self._notes = self.store.note_stats()
+        self._octaves = self.store.octave_stats(self._notes)
+        self._trend = self.store.daily_trend(self.days)
+        self._totals = self.store.totals()
+        self._surface = None
+
+    def handle_note(self, note, timestamp):
+        pass
+
+    def _render(self, size):
+        surface = pygame.Surface(size)
+        surface.fill((255, 255, 255))
+        width, height = size
+        text_color = (0, 0, 0)
+        count, accuracy = self._totals
+        if not count:
+            text = render_text(self.font, "No attempts recorded yet", True, text_color)
+            surface.blit(text, text.get_rect(center=(width // 2, height // 2)))
+            return surface
+        text = render_text(self.font, f"{count} attempts, {accuracy:.0%} correct", True, text_color)
+        surface.blit(text, (20, 15))
+
+        # Accuracy per note, one bar per key from A0 to C8
+        chart = pygame.Rect(20, 50, width - 40, height // 3)
+        pygame.draw.rect(surface, (230, 230, 230), chart)
+        bar_width = chart.width / 88
+        for note, (attempts, correct, _) in self._notes.items():
+            if not 21 <= note <= 108:
+                continue
+            ratio = correct / attempts
+            bar_height = int(chart.height * ratio)
+            bar = pygame.Rect(chart.left + int((note - 21) * bar_width), chart.bottom - bar_height,
+                              max(int(bar_width) - 1, 1), bar_height)
+            pygame.draw.rect(surface, accuracy_color(ratio), bar)
+        label = render_text(self.font, "Accuracy per note", True, (80, 80, 80))
+        surface.blit(label, (chart.left + 5, chart.top + 5))
+
+        # Accuracy and reaction time per octave
+        y = chart.bottom + 15
+        for octave, (attempts, correct, latency) in self._octaves.items():
+            line = f"Octave {octave}: {correct / attempts:.0%} of {attempts}, {latency:.0f} ms"
+            text = render_text(self.font, line, True, accuracy_color(correct / attempts))
+            surface.blit(text, (20, y))
+            y += text.get_height() + 4
+
+        # Daily accuracy over the last days
+        trend = pygame.Rect(width // 2, chart.bottom + 15, width // 2 - 20, height - chart.bottom - 35)
+        pygame.draw.rect(surface, (230, 230, 230), trend)
+        first = date.today().toordinal() - self.days + 1
+        points = [(trend.left + (day.toordinal() - first) * trend.width // max(self.days - 1, 1),
+                   trend.bottom - int(ratio * trend.height))
+                  for day, _, ratio, _ in self._trend]
+        if len(points) > 1:
+            pygame.draw.lines(surface, (40, 90, 200), False, points, 2)
+        for point in points:
+            pygame.draw.circle(surface, (40, 90, 200), point, 3)
+        label = render_text(self.font, f"Accuracy, last {self.days} days", True, (80, 80, 80))
+        surface.blit(label, (trend.left + 5, trend.top + 5))
+        return surface
+
+    def draw(self, surface, rect):
+        if self._surface is None or self._surface.get_size() != rect.size:
+            self._surface = self._render(rect.size)
+        surface.blit(self._surface, rect)
 
 
 # For testing the module directly
 if __name__ == "__main__":
-    window = MainWindow()
+    try:
+        midi_input = MidiInput().start()
+    except RuntimeError as e:
+        print(f"{e} Sight reading needs a MIDI keyboard.")
+        midi_input = None
+    window = MainWindow(midi_input=midi_input, store=AttemptStore())
     window.run()
\ No newline at end of file
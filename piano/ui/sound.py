@@ -0,0 +1,115 @@
+"""Synthesized piano-like notes played through pygame.mixer.
+
+Waveforms are generated with NumPy the first time a note is needed (or ahead
+of time with `prefetch`) and kept as `pygame.mixer.Sound` buffers in an LRU
+cache bounded in bytes. Playing a cached note only hands the buffer to the
+mixer, which mixes on its own thread, so the render and MIDI loop never wait.
+NumPy is optional (`pip install piano[audio]`); without it the application
+stays silent.
+"""
+
+import threading
+from collections import OrderedDict
+
+import pygame
+
+from piano.core.logger import get_logger
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 44100
+MIXER_BUFFER = 256  # Samples, about 6 ms at 44.1 kHz
+
+HARMONICS = ((1, 1.0), (2, 0.5), (3, 0.25), (4, 0.12))  # (multiple, amplitude)
+
+
+def pre_init():
+    """Ask for a small mixer buffer, must be called before pygame.init()."""
+    pygame.mixer.pre_init(SAMPLE_RATE, -16, 2, MIXER_BUFFER)
+
+
+def note_frequency(note):
+    """Frequency in Hz of a MIDI note, A4 (69) being 440 Hz."""
+    return 440.0 * 2 ** ((note - 69) / 12)
+
+
+class SoundBank:
+    """Cache of synthesized note sounds with a memory cap."""
+
+    def __init__(self, duration=1.5, volume=0.4, max_bytes=32 * 1024 * 1024):
+        """Keep at most `max_bytes` of sample data, least recently played notes are evicted."""
+        self.duration = duration
+        self.volume = volume
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._sounds = OrderedDict()  # Note -> (Sound, bytes)
+        self._lock = threading.Lock()
+        self.enabled = self._init_mixer()
+
+    def _init_mixer(self):
+        if np is None:
+            logger.warning("[Sound] - NumPy is not installed, sound is disabled")
+            return False
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(SAMPLE_RATE, -16, 2, MIXER_BUFFER)
+        except pygame.error as e:
+            logger.warning(f"[Sound] - No audio device, sound is disabled: {e}")
+            return False
+        self.sample_rate, _, self.channels = pygame.mixer.get_init()
+        return True
+
+    def _synthesize(self, note):
+        """Decaying additive tone for `note` as a mixer Sound."""
+        t = np.arange(int(self.sample_rate * self.duration)) / self.sample_rate
+        frequency = note_frequency(note)
+        wave = np.zeros_like(t)
+        for multiple, amplitude in HARMONICS:
+            if frequency * multiple < self.sample_rate / 2:
+                wave += amplitude * np.sin(2 * np.pi * frequency * multiple * t)
+        # Short attack to avoid a click, then an exponential decay
+        envelope = np.minimum(t / 0.005, 1.0) * np.exp(-3.0 * t)
+        wave *= envelope / sum(amplitude for _, amplitude in HARMONICS)
+        samples = (wave * 32767 * self.volume).astype(np.int16)
+        if self.channels > 1:
+            samples = np.repeat(samples[:, None], self.channels, axis=1)
+        return pygame.sndarray.make_sound(np.ascontiguousarray(samples)), samples.nbytes
+
+    def get(self, note):
+        """Sound of `note`, synthesized on first use."""
+        with self._lock:
+            entry = self._sounds.get(note)
+            if entry is not None:
+                self._sounds.move_to_end(note)
+                return entry[0]
+        sound, size = self._synthesize(note)
+        with self._lock:
+            if note not in self._sounds:
+                self._sounds[note] = (sound, size)
+                self.size += size
+                while self.size > self.max_bytes and len(self._sounds) > 1:
+                    _, (_, evicted) = self._sounds.popitem(last=False)
+                    self.size -= evicted
+        return sound
+
+    def play(self, note, velocity=100):
+        """Start playing `note`, returns immediately."""
+        if not self.enabled:
+            return
+        channel = self.get(note).play()
+        if channel is not None:
+            channel.set_volume(velocity / 127)
+
+    def prefetch(self, notes):
+        """Synthesize `notes` on a background thread so their first play is instant."""
+        if not self.enabled:
+            return None
+        thread = threading.Thread(target=lambda: [self.get(note) for note in notes],
+                                  name="sound-prefetch", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,52 @@
+"""Cache of rendered text surfaces shared by the UI modules."""
+
+from collections import OrderedDict
+
+
+class TextCache:
+    """Bounded LRU cache of `font.render` results.
+
+    Menu names, checkbox labels and history lines are the same from one frame
+    to the next, so after the first frame they are blitted from the cache
+    without rasterizing any glyph.
+    """
+
+    def __init__(self, maxsize=256):
+        """Keep at most `maxsize` rendered surfaces."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, antialias, color):
+        """Same as `font.render(text, antialias, color)`, served from the cache when possible."""
+        key = (font, text, antialias, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def hit_rate(self):
+        """Fraction of renders served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """Drop every cached surface, e.g. after fonts are reloaded."""
+        self._surfaces.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+
+# Shared by every widget and screen
+text_cache = TextCache()
+render_text = text_cache.render
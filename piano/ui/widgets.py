@@ -0,0 +1,160 @@
+"""Reusable widgets for the piano practice screens."""
+
+import pygame
+
+from piano.ui.text import render_text
+
+
+class Checkbox:
+    """Clickable checkbox with a text label on its right."""
+
+    def __init__(self, rect, label, checked=True):
+        self.rect = rect
+        self.label = label
+        self.checked = checked
+        self.bounds = pygame.Rect(rect)  # Box and label, known once drawn
+
+    def draw(self, surface, font, box_size=18):
+        pygame.draw.rect(surface, (180, 180, 180), self.rect)
+        if self.checked:
+            pygame.draw.rect(surface, (0, 120, 0), self.rect.inflate(-6, -6))
+        label_surface = render_text(font, self.label, True, (0, 0, 0))
+        label_rect = surface.blit(label_surface, (self.rect.x + box_size + 6, self.rect.y - 2))
+        self.bounds = self.rect.union(label_rect)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.rect.collidepoint(event.pos):
+                self.checked = not self.checked
+                return True
+        return False
+
+
+KEY_NORMAL = 0
+KEY_PRESSED = 1
+KEY_TARGET = 2
+
+FIRST_PIANO_KEY = 21  # A0
+LAST_PIANO_KEY = 108  # C8
+
+
+def is_black_key(note):
+    return note % 12 in (1, 3, 6, 8, 10)
+
+
+class KeyboardWidget:
+    """On-screen piano keyboard, 88 keys by default.
+
+    The keyboard is rendered once per size for every key state, highlighting a
+    key then only blits that key's region from the matching rendering. Mouse
+    hit-testing uses per-column lookup tables instead of testing key rects.
+    """
+
+    COLORS = {
+        KEY_NORMAL: ((255, 255, 255), (20, 20, 20)),  # (white key, black key)
+        KEY_PRESSED: ((120, 170, 255), (60, 110, 220)),
+        KEY_TARGET: ((130, 210, 130), (40, 150, 40)),
+    }
+
+    def __init__(self, rect, first=FIRST_PIANO_KEY, last=LAST_PIANO_KEY):
+        self.first = first
+        self.last = last
+        self.states = {}  # Note -> state, only keys not in KEY_NORMAL
+        self.resize(rect)
+
+    def resize(self, rect):
+        """Lay out and pre-render the keys for a new widget rectangle."""
+        self.rect = pygame.Rect(rect)
+        notes = range(self.first, self.last + 1)
+        whites = [n for n in notes if not is_black_key(n)]
+        white_width = self.rect.width / len(whites)
+        black_width = white_width * 0.6
+        self.black_height = int(self.rect.height * 0.62)
+
+        self.key_rects = {}
+        self.black_neighbors = {}  # White key -> black keys drawn over it
+        for i, note in enumerate(whites):
+            left = self.rect.x + round(i * white_width)
+            right = self.rect.x + round((i + 1) * white_width)
+            self.key_rects[note] = pygame.Rect(left, self.rect.y, right - left, self.rect.height)
+        for note in notes:
+            if is_black_key(note):
+                # Centered on the boundary with the white key below
+                center = self.key_rects[note - 1].right
+                self.key_rects[note] = pygame.Rect(round(center - black_width / 2), self.rect.y,
+                                                   round(black_width), self.black_height)
+                for white in (note - 1, note + 1):
+                    if white in self.key_rects:
+                        self.black_neighbors.setdefault(white, []).append(note)
+
+        # Column lookup tables for hit-testing, indexed by x relative to the widget
+        self.white_at = [None] * self.rect.width
+        self.black_at = [None] * self.rect.width
+        for note, key_rect in self.key_rects.items():
+            table = self.black_at if is_black_key(note) else self.white_at
+            for x in range(max(key_rect.left, self.rect.left), min(key_rect.right, self.rect.right)):
+                table[x - self.rect.x] = note
+
+        self.renderings = {state: self._render(state) for state in self.COLORS}
+
+    def _render(self, state):
+        """Whole keyboard with every key in `state` colors, in widget coordinates."""
+        white_color, black_color = self.COLORS[state]
+        surface = pygame.Surface(self.rect.size)
+        surface.fill((0, 0, 0))
+        offset = (-self.rect.x, -self.rect.y)
+        for note, key_rect in self.key_rects.items():
+            if not is_black_key(note):
+                pygame.draw.rect(surface, white_color, key_rect.move(offset).inflate(-2, 0))
+        for note, key_rect in self.key_rects.items():
+            if is_black_key(note):
+                pygame.draw.rect(surface, black_color, key_rect.move(offset))
+        return surface
+
+    def set_key(self, note, state):
+        """Change the state of a key, returns the screen region to redraw or None."""
+        if note not in self.key_rects or self.states.get(note, KEY_NORMAL) == state:
+            return None
+        if state == KEY_NORMAL:
+            del self.states[note]
+        else:
+            self.states[note] = state
+        return self.key_rects[note]
+
+    def key_at(self, pos):
+        """Note of the key under `pos`, None outside the keyboard."""
+        if not self.rect.collidepoint(pos):
+            return None
+        column = pos[0] - self.rect.x
+        if pos[1] - self.rect.y < self.black_height and self.black_at[column] is not None:
+            return self.black_at[column]
+        return self.white_at[column]
+
+    def _key_blits(self, note):
+        blits = [self._blit_args(note)]
+        # A white key's region covers part of its black neighbors, put them back on top
+        for black in self.black_neighbors.get(note, ()):
+            blits.append(self._blit_args(black))
+        return blits
+
+    def _blit_args(self, note):
+        key_rect = self.key_rects[note]
+        area = key_rect.move(-self.rect.x, -self.rect.y)
+        return self.renderings[self.states.get(note, KEY_NORMAL)], key_rect.topleft, area
+
+    def draw(self, surface):
+        """Draw the keyboard with its highlighted keys."""
+        surface.blit(self.renderings[KEY_NORMAL], self.rect.topleft)
+        blits = []
+        for note in self.states:
+            blits.extend(self._key_blits(note))
+        surface.blits(blits, doreturn=False)
+
+    def draw_keys(self, surface, notes):
+        """Redraw only the given keys, returns the updated rects."""
+        blits = []
+        for note in notes:
+            if note in self.key_rects:
+                blits.extend(self._key_blits(note))
+        surface.blits(blits, doreturn=False)
+        return [self.key_rects[note] for note in notes if note in self.key_rects]
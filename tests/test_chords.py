@@ -0,0 +1,47 @@
+from piano.core.chords import ChordTarget, ChordTracker, chord_targets, identify_chord, note_mask
+
+
+def test_identifies_inversions():
+    assert identify_chord(note_mask([64, 67, 72])) == (0, 'maj', 1)
+    assert identify_chord(note_mask([58, 60, 64, 67])) == (0, '7', 3)
+    assert ChordTarget(60, 'min', 2).notes() == (67, 72, 75)
+
+
+def test_chord_targets_skip_missing_inversions():
+    targets = chord_targets([60], ('maj', '7'), (0, 3))
+    assert targets == [ChordTarget(60, 'maj', 0), ChordTarget(60, '7', 0), ChordTarget(60, '7', 3)]
+
+
+def test_tracker_groups_keys_within_window():
+    tracker = ChordTracker(window_ms=80)
+    tracker.note_on(60, 0)
+    tracker.note_on(64, 30)
+    assert tracker.note_on(67, 70) == (0, 'maj', 0)
+
+
+def test_slow_roll_keeps_held_keys():
+    tracker = ChordTracker(window_ms=80)
+    tracker.note_on(60, 0)
+    tracker.note_on(64, 200)
+    match = tracker.note_on(67, 400)
+    assert match == (0, 'maj', 0)
+    assert tracker.gesture == note_mask([60, 64, 67])
+
+
+def test_released_keys_leave_the_gesture():
+    tracker = ChordTracker(window_ms=80)
+    tracker.note_on(60, 0)
+    tracker.note_off(60)
+    tracker.note_on(64, 200)
+    assert tracker.gesture == note_mask([64])
+
+
+def test_new_gesture_ignores_keys_still_held():
+    tracker = ChordTracker(window_ms=80)
+    for note in (60, 64, 67):
+        tracker.note_on(note, 0)
+    tracker.new_gesture()
+    tracker.note_on(62, 500)
+    assert tracker.gesture == note_mask([62])
+    tracker.note_on(60, 520)  # Pressed again, part of the new gesture
+    assert tracker.gesture == note_mask([60, 62])
@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("pygame")
+
+from piano.midi.input import ControlChange, MidiDecoder, NoteOff, NoteOn, PitchBend  # noqa: E402
+
+
+def batch(*messages):
+    """pygame.midi events from (status, data1, data2) tuples, timestamped 0, 1, 2..."""
+    return [[[status, data1, data2, 0], timestamp] for timestamp, (status, data1, data2) in enumerate(messages)]
+
+
+def describe(messages):
+    return [(type(m).__name__, m.channel, getattr(m, 'note', None), m.timestamp) for m in messages]
+
+
+def test_note_on_every_channel():
+    messages = MidiDecoder().decode(batch(*[(0x90 | channel, 60 + channel, 100) for channel in range(16)]))
+    assert [(type(m), m.channel, m.note) for m in messages] == [(NoteOn, c + 1, 60 + c) for c in range(16)]
+
+
+def test_velocity_zero_note_on_is_note_off():
+    messages = MidiDecoder().decode(batch((0x93, 64, 0)))
+    assert describe(messages) == [("NoteOff", 4, 64, 0)]
+    assert MidiDecoder(kinds=(NoteOn,)).decode(batch((0x93, 64, 0))) == []
+
+
+def test_control_change_and_pitch_bend_values():
+    cc, low, center, high = MidiDecoder().decode(batch((0xB0, 64, 127), (0xE1, 0, 0), (0xE1, 0, 64), (0xE1, 127, 127)))
+    assert (type(cc), cc.control, cc.value) == (ControlChange, 64, 127)
+    assert [type(m) for m in (low, center, high)] == [PitchBend] * 3
+    assert (low.value, center.value, high.value) == (-8192, 0, 8191)
+
+
+def test_running_status_survives_real_time_messages():
+    messages = MidiDecoder().decode(batch((0x91, 60, 100), (62, 90, 0), (0xF8, 0, 0), (64, 80, 0), (0xFE, 0, 0), (67, 0, 0)))
+    assert describe(messages) == [("NoteOn", 2, 60, 0), ("NoteOn", 2, 62, 1), ("NoteOn", 2, 64, 3),
+                                  ("NoteOff", 2, 67, 5)]
+
+
+@pytest.mark.parametrize("system_common", range(0xF0, 0xF8))
+def test_running_status_cancelled_by_system_common(system_common):
+    decoder = MidiDecoder()
+    messages = decoder.decode(batch((0x90, 60, 100), (system_common, 0, 0), (62, 90, 0)))
+    assert describe(messages) == [("NoteOn", 1, 60, 0)]
+    assert decoder.running_status == 0
+
+
+def test_running_status_carries_over_batches():
+    decoder = MidiDecoder()
+    decoder.decode(batch((0x95, 60, 100)))
+    assert describe(decoder.decode(batch((62, 90, 0)))) == [("NoteOn", 6, 62, 0)]
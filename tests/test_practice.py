@@ -0,0 +1,119 @@
+import random
+
+from piano.core.chords import ChordTarget
+from piano.core.practice import AdaptiveSelector, AttemptStatus, NotePool, PracticeHistory, ScoreFollower
+
+
+def make_selector():
+    return AdaptiveSelector(NotePool([4], rng=random.Random(1)))
+
+
+def test_weights_rank_weak_above_unseen_above_learned():
+    selector = make_selector()
+    pool = selector.pool
+    weak, unseen, learned = 60, 62, 64
+    selector.record(weak, False, 800)
+    selector.record(learned, True, 800)
+
+    weight = pool.weights.get
+    assert weight(weak, 1.0) > weight(unseen, 1.0) > weight(learned, 1.0)
+
+
+def test_learned_stays_below_unseen_after_errors():
+    selector = make_selector()
+    note = 60
+    for correct in (False, False, False, True):
+        selector.record(note, correct, 800)
+    assert selector.stats[note].box == 1
+    assert selector.pool.weights[note] < 1.0
+
+
+def test_more_errors_raise_box_zero_weight():
+    selector = make_selector()
+    weights = []
+    for _ in range(3):
+        selector.record(60, False, 800)
+        weights.append(selector.pool.weights[60])
+    assert weights[0] < weights[1] < weights[2] < selector.pool.max_weight
+
+
+def test_history_keeps_prompt_text_as_shown():
+    history = PracticeHistory(capacity=4)
+    history.add_prompt(60, 0, "Play: C4 (Do)")
+    history.resolve(60, AttemptStatus.SUCCESS, 500)
+    history.add_prompt(62, 500, "Play: D4")
+    rows = history.lines(8, lambda note: "rewritten", str)
+    assert rows == [("Play: C4 (Do) | You played: 60", AttemptStatus.SUCCESS),
+                    ("Play: D4", AttemptStatus.PENDING)]
+    latencies = [latency for _, _, _, _, latency in history.last(2)]
+    assert latencies == [500, 0]
+
+
+def test_history_memory_is_bounded():
+    history = PracticeHistory(capacity=4)
+    for i in range(10):
+        history.add_prompt(60 + i, i, f"Play {i}")
+    assert len(history) == 4
+    assert [text for text, _ in history.lines(8, str, str)] == ["Play 6", "Play 7", "Play 8", "Play 9"]
+
+
+def test_pool_mixes_notes_and_chords():
+    pool = NotePool([4], white_keys_only=True, chord_qualities=('maj', 'min'))
+    candidates = pool.candidates()
+    assert len(candidates) == 21
+    pool.set_chords(())
+    assert pool.candidates() == (60, 62, 64, 65, 67, 69, 71)
+
+
+def test_pool_adds_inversions_and_sevenths():
+    pool = NotePool([4], white_keys_only=True)
+    pool.set_chords(('maj', 'maj7'), inversions=(0, 1, 2, 3))
+    # Per root: maj in 3 positions, maj7 in 4
+    assert len(pool) == 7 + 7 * (3 + 4)
+    assert ChordTarget(60, 'maj7', 3) in pool
+    pool.set_chords(('maj',))
+    assert len(pool) == 7 + 7
+    assert ChordTarget(60, 'maj', 1) not in pool
+
+
+def follow(reference, played, **options):
+    follower = ScoreFollower(reference, **options)
+    steps = [follower.follow(note) for note in played]
+    return follower, steps
+
+
+def test_follower_exact_play():
+    follower, steps = follow([60, 62, 64, 65], [60, 62, 64, 65])
+    assert steps == [(1, True), (2, True), (3, True), (4, True)]
+    assert follower.expected() is None and follower.finished()
+    assert follower.accuracy() == 1.0
+
+
+def test_follower_extra_note_keeps_position():
+    follower, steps = follow([60, 62, 64, 65], [60, 61, 62, 64, 65])
+    assert steps == [(1, True), (1, False), (2, True), (3, True), (4, True)]
+    assert (follower.matched, follower.played) == (4, 5)
+
+
+def test_follower_skipped_note():
+    # Tie-break: the note right after the skip counts as extra, the next one catches up
+    follower, steps = follow([60, 62, 64, 65, 67], [60, 64, 65, 67])
+    assert steps == [(1, True), (1, False), (4, True), (5, True)]
+    assert follower.finished()
+
+
+def test_follower_wrong_note_in_place():
+    follower, steps = follow([60, 62, 64, 65], [60, 63, 64, 65])
+    assert steps == [(1, True), (1, False), (3, True), (4, True)]
+    assert follower.accuracy() == 0.75
+
+
+def test_follower_band_shifts_through_long_piece():
+    reference = [60 + i % 12 for i in range(50)]
+    follower, _ = follow(reference, reference, window=8)
+    assert (follower.position, follower.matched) == (50, 50)
+    assert follower.base > 0
+    played = reference[:20] + reference[21:]  # One note skipped far past the first band
+    follower, _ = follow(reference, played, window=8)
+    assert follower.finished()
+    assert (follower.matched, follower.played) == (48, 49)
@@ -0,0 +1,46 @@
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("pygame")
+pytest.importorskip("numpy")  # The heatmap overlay needs it
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+PRACTICE_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               "midi_pkg", "02_practice.py")
+
+
+@pytest.fixture
+def app():
+    from piano.midi.input import SyntheticSource
+
+    spec = importlib.util.spec_from_file_location("practice_script", PRACTICE_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    app = module.PracticeApp(source=SyntheticSource(0), db_path=None)
+    yield app
+    app.midi_input.close()
+
+
+def draw_keyboard(app):
+    app.draw_keyboard()
+    app.renderer.present()
+
+
+def test_hiding_heatmap_clears_the_overlay(app):
+    app.heatmap.add(60, True, 300)
+    point = app.keyboard.key_rects[60].center
+    draw_keyboard(app)
+    plain = app.screen.get_at(point)
+
+    app.toggle_heatmap()
+    draw_keyboard(app)
+    assert app.screen.get_at(point) != plain
+
+    app.toggle_heatmap()
+    draw_keyboard(app)
+    assert not app.show_heatmap
+    assert app.screen.get_at(point) == plain
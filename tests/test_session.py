@@ -0,0 +1,68 @@
+from piano.core.chords import CHORD_QUALITIES, ChordTarget
+from piano.core.session import HEADER, RECORD, KIND_MIDI, KIND_PROMPT, SessionReader, SessionRecorder
+
+
+def note_on(note, timestamp):
+    return [[0x90, note, 100, 0], timestamp]
+
+
+def record_session(path):
+    with SessionRecorder(path) as recorder:
+        recorder.record_events([note_on(60, 10), note_on(62, 20)])
+        # Prompt shown after its batch, later than events captured meanwhile
+        recorder.record_prompt(64, 35)
+        recorder.record_events([note_on(64, 30), note_on(65, 50)])
+        recorder.record_prompt(ChordTarget(60, 'min7', 2), 60)
+        recorder.record_prompt(ChordTarget(62, 'sus4', 0), 70)
+        recorder.record_events([note_on(67, 80)])
+
+
+def test_round_trip_keeps_timestamps_non_decreasing(tmp_path):
+    path = tmp_path / "session.ppsn"
+    record_session(path)
+    with SessionReader(path) as session:
+        records = list(session.records())
+        assert len(session) == 8
+        timestamps = [timestamp for timestamp, *_ in records]
+        assert timestamps == sorted(timestamps)
+        # The event captured before the prompt was shown is moved to the prompt time
+        assert records[2] == (35, KIND_PROMPT, 64, 0, 0)
+        assert records[3] == (35, KIND_MIDI, 0x90, 64, 100)
+        assert session.midi_events() == [note_on(60, 10), note_on(62, 20), note_on(64, 35),
+                                         note_on(65, 50), note_on(67, 80)]
+
+
+def test_seek_time(tmp_path):
+    path = tmp_path / "session.ppsn"
+    record_session(path)
+    with SessionReader(path) as session:
+        assert session.seek_time(0) == 0
+        assert session.seek_time(20) == 1
+        assert session.seek_time(30) == 2
+        assert session.seek_time(36) == 4
+        assert session.seek_time(1000) == len(session)
+        assert session.midi_events(start_ms=50) == [note_on(65, 50), note_on(67, 80)]
+
+
+def test_chord_prompts_round_trip(tmp_path):
+    path = tmp_path / "session.ppsn"
+    record_session(path)
+    with SessionReader(path) as session:
+        assert list(session.prompts()) == [(35, 64), (60, ChordTarget(60, 'min7', 2)),
+                                           (70, ChordTarget(62, 'sus4', 0))]
+        # Qualities are stored by their index in CHORD_QUALITIES, plus one
+        timestamp, kind, root, quality, inversion = session[6]
+        assert list(CHORD_QUALITIES)[quality - 1] == 'sus4'
+
+
+def test_truncated_last_record_is_ignored(tmp_path):
+    path = tmp_path / "session.ppsn"
+    record_session(path)
+    size = path.stat().st_size
+    assert size == HEADER.size + 8 * RECORD.size
+    with open(path, 'r+b') as f:
+        f.truncate(size - 2)
+    with SessionReader(path) as session:
+        assert len(session) == 7
+        assert session.seek_time(1000) == 7
+        assert session.midi_events(start_ms=50) == [note_on(65, 50)]
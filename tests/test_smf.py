@@ -0,0 +1,67 @@
+import struct
+
+from piano.midi.smf import EXPORT_DIVISION, MidiFile, write_smf
+
+
+def smf_bytes(division, *tracks, file_format=1):
+    """A Standard MIDI File from raw track bodies (delta times and events, end of track appended)."""
+    data = b'MThd' + struct.pack('>IHHh', 6, file_format, len(tracks), division)
+    for body in tracks:
+        body += bytes([0, 0xFF, 0x2F, 0])
+        data += b'MTrk' + struct.pack('>I', len(body)) + body
+    return data
+
+
+def tempo(delta, microseconds_per_beat):
+    """Set tempo meta event, `delta` being the encoded delta time bytes."""
+    return bytes(delta) + bytes([0xFF, 0x51, 3]) + microseconds_per_beat.to_bytes(3, 'big')
+
+
+def load(tmp_path, data):
+    path = tmp_path / "test.mid"
+    path.write_bytes(data)
+    return MidiFile(path)
+
+
+def test_export_round_trip_one_tick_per_ms(tmp_path):
+    path = tmp_path / "session.mid"
+    events = [[[0x90, 60, 100, 0], 100], [[0xF8, 0, 0, 0], 200], [[0x80, 60, 0, 0], 350],
+              [[0xB0, 64, 127, 0], 1100], [[0xC0, 5, 0, 0], 1100], [[0x91, 62, 90, 0], 1100]]
+    write_smf(path, iter(events), track_name="session")
+    midi = MidiFile(path)
+    assert (midi.format, midi.track_count, midi.division) == (0, 1, EXPORT_DIVISION)
+    # Times start at the first event, system messages are not exported
+    assert list(midi.events()) == [[[0x90, 60, 100, 0], 0], [[0x80, 60, 0, 0], 250],
+                                   [[0xB0, 64, 127, 0], 1000], [[0xC0, 5, 0, 0], 1000],
+                                   [[0x91, 62, 90, 0], 1000]]
+
+
+def test_running_status(tmp_path):
+    track = bytes([0, 0x90, 60, 100, 96, 62, 100, 96, 0x80, 60, 0, 0, 62, 0])
+    midi = load(tmp_path, smf_bytes(96, track, file_format=0))
+    assert list(midi.events()) == [[[0x90, 60, 100, 0], 0], [[0x90, 62, 100, 0], 500],
+                                   [[0x80, 60, 0, 0], 1000], [[0x80, 62, 0, 0], 1000]]
+
+
+def test_tempo_changes_apply_across_tracks(tmp_path):
+    # 480 ticks per beat: a beat lasts 500 ms at the default tempo, then 1 s from tick 480
+    conductor = tempo([0], 500_000) + tempo([0x83, 0x60], 1_000_000)
+    notes = bytes([0, 0x90, 60, 100, 0x83, 0x60, 0x90, 62, 100, 0x83, 0x60, 0x90, 64, 100])
+    midi = load(tmp_path, smf_bytes(480, conductor, notes))
+    assert [timestamp for _, timestamp in midi.events()] == [0, 500, 1500]
+
+
+def test_smpte_division(tmp_path):
+    # 25 frames per second, 40 ticks per frame: one tick per ms whatever the tempo
+    division = struct.unpack('>h', bytes([256 - 25, 40]))[0]
+    track = tempo([0], 1_000_000) + bytes([0, 0x90, 60, 100, 0x81, 0x48, 0x80, 60, 0])
+    midi = load(tmp_path, smf_bytes(division, track, file_format=0))
+    assert list(midi.events()) == [[[0x90, 60, 100, 0], 0], [[0x80, 60, 0, 0], 200]]
+
+
+def test_melody_skips_drums_unless_asked(tmp_path):
+    track = bytes([0, 0x90, 60, 100, 0, 0x99, 36, 100, 0, 0x91, 64, 90, 0, 0x90, 67, 0])
+    midi = load(tmp_path, smf_bytes(96, track, file_format=0))
+    assert list(midi.melody()) == [60, 64]
+    assert list(midi.melody(10)) == [36]
+    assert list(midi.melody(2)) == [64]